@@ -1,26 +1,55 @@
 """
 Advanced Permissions Engine for RxDsec CLI
 ===========================================
-Production-ready permissions system with YAML configuration,
+Production-ready permissions system with JSON configuration,
 pattern matching, and interactive confirmation.
 """
 
 from __future__ import annotations
 
 import fnmatch
+import heapq
+import json
 import logging
+import os
 import re
+import sys
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from enum import Enum, auto
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
-from urllib.parse import urlparse
+from typing import Any, Callable, ClassVar, Dict, Hashable, Iterable, List, Optional, Set, Tuple
 
-import yaml
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    HAS_WATCHDOG = True
+except ImportError:
+    HAS_WATCHDOG = False
+    Observer = None
+    FileSystemEventHandler = object
 
 # Configure module logger
 logger = logging.getLogger(__name__)
 
+# Maximum number of remembered confirmation decisions
+CONFIRMATION_CACHE_SIZE = 1024
+
+# dataclass(slots=True) needs Python 3.10+; older versions keep a __dict__
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+def _compile_glob(pattern: str) -> Optional[re.Pattern]:
+    """
+    Compile a glob to a regex, returning None for match-all globs ("*", "**").
+    
+    Like fnmatch, the pattern goes through os.path.normcase, so on Windows
+    it must be matched against names normalised the same way.
+    """
+    if pattern and not pattern.strip("*"):
+        return None
+    return re.compile(fnmatch.translate(os.path.normcase(pattern)))
+
 
 class PermissionAction(Enum):
     """Possible permission actions"""
@@ -38,7 +67,27 @@ class ToolCategory(Enum):
     ALL = "all"
 
 
-@dataclass
+# Config string -> enum member lookups (KeyError on unknown values)
+_ACTION_FROM_STR: Dict[str, PermissionAction] = {m.value: m for m in PermissionAction}
+_CATEGORY_FROM_STR: Dict[str, ToolCategory] = {m.value: m for m in ToolCategory}
+
+# Symbols used when listing rules in the system prompt
+_ACTION_SYMBOLS: Dict[PermissionAction, str] = {
+    PermissionAction.ALLOW: "✓",
+    PermissionAction.DENY: "✗",
+    PermissionAction.CONFIRM: "?",
+}
+
+# Tool name -> category lookup
+_TOOL_CATEGORY: Dict[str, ToolCategory] = {
+    **{t: ToolCategory.READ for t in ('read', 'read_lines', 'grep', 'find')},
+    **{t: ToolCategory.WRITE for t in ('write', 'write_lines', 'patch')},
+    **{t: ToolCategory.EXEC for t in ('localexec', 'shell', 'run_tests')},
+    **{t: ToolCategory.WEB for t in ('webfetch', 'download', 'web_search')},
+}
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class PermissionRule:
     """A single permission rule"""
     action: PermissionAction
@@ -46,6 +95,37 @@ class PermissionRule:
     pattern: str
     priority: int = 0
     description: str = ""
+    # Compiled glob halves of the pattern (None means "match anything")
+    _tool_re: Optional[re.Pattern] = field(default=None, init=False, repr=False, compare=False)
+    _resource_re: Optional[re.Pattern] = field(default=None, init=False, repr=False, compare=False)
+    # Matcher specialised for the pattern's shape, picked in compile()
+    _match_fn: Optional[Callable[[str, str], bool]] = field(default=None, init=False, repr=False, compare=False)
+    # True when the pattern matches every tool/resource of the rule's category
+    _universal: bool = field(default=False, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        """Precompile the glob pattern so matching never goes through fnmatch"""
+        self.compile()
+    
+    def compile(self):
+        """Translate the pattern's glob halves to compiled regexes"""
+        if self.pattern and not self.pattern.strip("*"):
+            self._tool_re = None
+            self._resource_re = None
+        elif ":" in self.pattern:
+            pattern_tool, pattern_resource = self.pattern.split(":", 1)
+            self._tool_re = _compile_glob(pattern_tool)
+            self._resource_re = _compile_glob(pattern_resource)
+        else:
+            # Pattern without colon - treat as resource pattern
+            self._tool_re = None
+            self._resource_re = _compile_glob(self.pattern)
+        
+        self._universal = self._tool_re is None and self._resource_re is None
+        if self._tool_re is None:
+            self._match_fn = self._match_any if self._resource_re is None else self._match_resource
+        else:
+            self._match_fn = self._match_tool if self._resource_re is None else self._match_both
     
     def matches(self, tool: str, resource: str) -> bool:
         """Check if this rule matches the tool/resource"""
@@ -55,57 +135,168 @@ class PermissionRule:
             if tool_category != self.category:
                 return False
         
-        # Check pattern
-        if self.pattern == "*":
+        if self._universal:
             return True
-        
-        # Check if pattern is for tool or resource
-        if ":" in self.pattern:
-            pattern_tool, pattern_resource = self.pattern.split(":", 1)
-            if pattern_tool != "*" and not fnmatch.fnmatch(tool, pattern_tool):
-                return False
-            if pattern_resource != "*" and not fnmatch.fnmatch(resource, pattern_resource):
-                return False
-            return True
-        
-        # Pattern without colon - treat as resource pattern
-        return fnmatch.fnmatch(resource, self.pattern)
+        return self._match_fn(tool, resource)
+    
+    def _match_any(self, tool: str, resource: str) -> bool:
+        return True
+    
+    def _match_tool(self, tool: str, resource: str) -> bool:
+        return self._tool_re.match(os.path.normcase(tool)) is not None
+    
+    def _match_resource(self, tool: str, resource: str) -> bool:
+        return self._resource_re.match(os.path.normcase(resource)) is not None
+    
+    def _match_both(self, tool: str, resource: str) -> bool:
+        return (self._tool_re.match(os.path.normcase(tool)) is not None
+                and self._resource_re.match(os.path.normcase(resource)) is not None)
     
     def _get_tool_category(self, tool: str) -> ToolCategory:
         """Determine the category of a tool"""
-        read_tools = {'read', 'read_lines', 'grep', 'find'}
-        write_tools = {'write', 'write_lines', 'patch'}
-        exec_tools = {'localexec', 'shell', 'run_tests'}
-        web_tools = {'webfetch', 'download', 'web_search'}
-        
-        if tool in read_tools:
-            return ToolCategory.READ
-        elif tool in write_tools:
-            return ToolCategory.WRITE
-        elif tool in exec_tools:
-            return ToolCategory.EXEC
-        elif tool in web_tools:
-            return ToolCategory.WEB
-        return ToolCategory.ALL
+        return _TOOL_CATEGORY.get(tool, ToolCategory.ALL)
+
+
+def _sort_by_priority(rules: List[PermissionRule]) -> Tuple[PermissionRule, ...]:
+    """Sort rules by priority (higher priority first), keeping file order on ties"""
+    return tuple(sorted(rules, key=lambda r: r.priority, reverse=True))
+
+
+class ConfigFileHandler(FileSystemEventHandler if HAS_WATCHDOG else object):
+    """File handler that drops the engine's cached config when a config file changes"""
+    
+    def __init__(self, engine: "PermissionsEngine"):
+        self.engine = engine
+    
+    def _handle(self, event):
+        paths = {getattr(event, 'src_path', None), getattr(event, 'dest_path', None)}
+        watched = {os.path.abspath(p) for p in paths if p}
+        if watched & self.engine._watched_paths:
+            logger.debug(f"Permissions config changed: {event.src_path}")
+            self.engine._invalidate_config_cache()
+    
+    # Only content changes matter; opened/closed events fire on our own reads
+    on_modified = _handle
+    on_created = _handle
+    on_deleted = _handle
+    on_moved = _handle
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class PermissionsConfig:
     """Complete permissions configuration"""
-    rules: List[PermissionRule] = field(default_factory=list)
-    presets: Dict[str, List[PermissionRule]] = field(default_factory=dict)
+    # Rule tuples are kept sorted by priority (higher priority first)
+    rules: Tuple[PermissionRule, ...] = ()
+    presets: Dict[str, Tuple[PermissionRule, ...]] = field(default_factory=dict)
     active_preset: Optional[str] = None
     confirmation_cache: Dict[str, bool] = field(default_factory=dict)
+    # Effective rules partitioned by the tool category they can apply to
+    _rules_by_category: Optional[Dict[ToolCategory, List[PermissionRule]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # Per-tool combined resource matchers used for matching
+    _resource_runs: Dict[str, List[Tuple[PermissionAction, Optional[Callable]]]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
     
-    def get_effective_rules(self) -> List[PermissionRule]:
-        """Get rules including active preset"""
-        effective = self.rules.copy()
-        
-        if self.active_preset and self.active_preset in self.presets:
-            effective.extend(self.presets[self.active_preset])
+    def get_effective_rules(self) -> Tuple[PermissionRule, ...]:
+        """Get rules including active preset, highest priority first"""
+        preset_rules = self.presets.get(self.active_preset) if self.active_preset else None
+        if not preset_rules:
+            return self.rules
+        
+        # Both halves are already sorted; merge keeps config rules first on ties
+        return tuple(heapq.merge(
+            self.rules, preset_rules, key=lambda r: r.priority, reverse=True
+        ))
+    
+    def get_category_rules(self, category: ToolCategory) -> List[PermissionRule]:
+        """
+        Get effective rules that can apply to a tool of the given category.
         
-        # Sort by priority (higher priority first)
-        return sorted(effective, key=lambda r: r.priority, reverse=True)
+        Each bucket holds the category's own rules plus the ALL-category
+        rules, in priority order, and stops at the first rule whose pattern
+        matches everything. Buckets are built once per config.
+        """
+        if self._rules_by_category is None:
+            effective = self.get_effective_rules()
+            self._rules_by_category = {}
+            for cat in ToolCategory:
+                bucket = []
+                for rule in effective:
+                    if rule.category in (cat, ToolCategory.ALL):
+                        bucket.append(rule)
+                        # Nothing after a universal rule can ever be reached
+                        if rule._universal:
+                            break
+                self._rules_by_category[cat] = bucket
+        return self._rules_by_category[category]
+    
+    def get_resource_runs(self, tool: str) -> List[Tuple[PermissionAction, Optional[Callable]]]:
+        """
+        Get the rules applicable to a tool as runs of combined resource regexes.
+        
+        Rules are filtered by category and tool pattern, then consecutive
+        rules sharing an action are joined into one alternation, so the
+        first matching run gives the same answer as the first matching
+        rule. Each run carries its regex's bound match method, or None when
+        it matches every resource. Runs are built once per tool per config.
+        Resources must be passed through os.path.normcase before matching.
+        """
+        runs = self._resource_runs.get(tool)
+        if runs is not None:
+            return runs
+        
+        grouped: List[Tuple[PermissionAction, List[Optional[re.Pattern]]]] = []
+        tool_name = os.path.normcase(tool)
+        for rule in self.get_category_rules(_TOOL_CATEGORY.get(tool, ToolCategory.ALL)):
+            if rule._tool_re is not None and rule._tool_re.match(tool_name) is None:
+                continue
+            if grouped and grouped[-1][0] == rule.action:
+                grouped[-1][1].append(rule._resource_re)
+            else:
+                grouped.append((rule.action, [rule._resource_re]))
+        
+        runs = []
+        for run_action, regexes in grouped:
+            if None in regexes:
+                runs.append((run_action, None))
+                break
+            combined = re.compile("|".join(f"(?:{r.pattern})" for r in regexes))
+            runs.append((run_action, combined.match))
+        
+        self._resource_runs[tool] = runs
+        return runs
+
+
+class ConfirmationCache:
+    """Size-capped LRU mapping of confirmation keys to decisions"""
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, bool]" = OrderedDict()
+    
+    def get(self, key: Hashable) -> Optional[bool]:
+        """Get a cached decision, marking it as recently used"""
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+    
+    def __setitem__(self, key: Hashable, value: bool):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def clear(self):
+        self._data.clear()
 
 
 class PermissionsEngine:
@@ -113,11 +304,12 @@ class PermissionsEngine:
     Manage permissions for RxDsec tools.
     
     Features:
-    - YAML-based configuration
+    - JSON-based configuration
     - Allow/deny/confirm rules
     - Pattern matching (glob and regex)
     - Preset profiles (security, open)
     - Confirmation caching
+    - Config caching with watchdog (or mtime) invalidation
     """
     
     # Default configuration
@@ -170,6 +362,9 @@ class PermissionsEngine:
         ]
     }
     
+    # Parsed PRESETS, shared by every config load
+    _PRESET_RULES_CACHE: ClassVar[Optional[Dict[str, Tuple[PermissionRule, ...]]]] = None
+    
     def __init__(self, workspace: Path):
         """
         Initialize the permissions engine.
@@ -178,49 +373,159 @@ class PermissionsEngine:
             workspace: Workspace directory
         """
         self.workspace = workspace
-        self.local_config = workspace / ".rxdsec" / "permissions.yaml"
-        self.global_config = Path.home() / ".rxdsec" / "permissions.yaml"
+        self.local_config = workspace / ".rxdsec" / "permissions.json"
+        self.global_config = Path.home() / ".rxdsec" / "permissions.json"
         
         # Confirmation cache (for "confirm once" behavior)
-        self._confirmation_cache: Dict[str, bool] = {}
+        self._confirmation_cache = ConfirmationCache(CONFIRMATION_CACHE_SIZE)
+        
+        # Parsed config, reused until a config file changes
+        self._config_cache: Optional[PermissionsConfig] = None
+        self._config_generation = 0
+        self._config_signature: Optional[Tuple] = None
+        self._rules_str_cache: Optional[str] = None
+        self._watched_paths = {
+            os.path.abspath(str(p)) for p in (self.local_config, self.global_config)
+        }
+        self._observer = None
         
         # Ensure config exists
         self._ensure_config()
+        self._start_watching()
+    
+    def _start_watching(self):
+        """Watch config directories so the cache is dropped only on real changes"""
+        if not HAS_WATCHDOG:
+            return
+        
+        try:
+            handler = ConfigFileHandler(self)
+            observer = Observer()
+            for directory in {self.local_config.parent, self.global_config.parent}:
+                observer.schedule(handler, str(directory), recursive=False)
+            observer.start()
+            self._observer = observer
+        except Exception as e:
+            # e.g. inotify watch limit reached - fall back to stat checks
+            logger.debug(f"Permissions config watcher unavailable: {e}")
+    
+    def stop_watching(self):
+        """Stop watching config files (falls back to stat checks)"""
+        if self._observer:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+            self._invalidate_config_cache()
+    
+    def _invalidate_config_cache(self):
+        """Drop the cached config so the next check re-reads the files"""
+        self._config_generation += 1
+        self._config_cache = None
+        self._rules_str_cache = None
+    
+    def _stat_config_files(self) -> Tuple:
+        """Get an (mtime, size) signature of the config files"""
+        signature = []
+        for config_path in (self.global_config, self.local_config):
+            try:
+                st = os.stat(config_path)
+                signature.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
     
     def _ensure_config(self):
         """Ensure configuration files exist"""
         for config_path in [self.local_config, self.global_config]:
+            if not config_path.exists():
+                self._migrate_legacy_config(config_path)
             if not config_path.exists():
                 config_path.parent.mkdir(parents=True, exist_ok=True)
                 self._save_config(self.DEFAULT_CONFIG, config_path)
     
+    def _migrate_legacy_config(self, config_path: Path):
+        """Convert a permissions.yaml from older versions to JSON, once"""
+        legacy_path = config_path.with_suffix(".yaml")
+        if not legacy_path.exists():
+            return
+        
+        try:
+            import yaml
+            
+            with open(legacy_path) as f:
+                data = yaml.safe_load(f) or {}
+            self._save_config(data, config_path)
+            legacy_path.unlink()
+            logger.info(f"Migrated {legacy_path} to {config_path}")
+        except Exception as e:
+            logger.warning(f"Failed to migrate permissions from {legacy_path}: {e}")
+    
     def _save_config(self, config: Dict, path: Path):
         """Save configuration to file"""
         with open(path, 'w') as f:
-            yaml.dump(config, f, default_flow_style=False)
+            json.dump(config, f, indent=2)
+        
+        self._invalidate_config_cache()
+    
+    @classmethod
+    def _get_preset_rules(cls) -> Dict[str, Tuple[PermissionRule, ...]]:
+        """Get parsed preset rules, building them once per class"""
+        if cls._PRESET_RULES_CACHE is None:
+            cls._PRESET_RULES_CACHE = {
+                preset_name: _sort_by_priority([
+                    PermissionRule(
+                        action=_ACTION_FROM_STR[r["action"]],
+                        category=_CATEGORY_FROM_STR[r["category"]],
+                        pattern=sys.intern(r["pattern"]),
+                        priority=r.get("priority", 0),
+                        description=r.get("description", "")
+                    )
+                    for r in preset_rules
+                ])
+                for preset_name, preset_rules in cls.PRESETS.items()
+            }
+        return cls._PRESET_RULES_CACHE
     
     def _load_config(self) -> PermissionsConfig:
-        """Load and merge configurations"""
+        """Load and merge configurations, reusing the cached copy while unchanged"""
+        if self._observer is None:
+            # No watcher: detect changes by stat'ing the files
+            signature = self._stat_config_files()
+            if signature != self._config_signature:
+                self._config_signature = signature
+                self._invalidate_config_cache()
+        
+        config = self._config_cache
+        if config is None:
+            generation = self._config_generation
+            config = self._read_config()
+            # Don't keep a config that was invalidated while it was being read
+            if generation == self._config_generation:
+                self._config_cache = config
+        return config
+    
+    def _read_config(self) -> PermissionsConfig:
+        """Read and merge configurations from disk"""
         config = PermissionsConfig()
+        rules = []
         
         for config_path in [self.global_config, self.local_config]:
             if config_path.exists():
                 try:
-                    with open(config_path) as f:
-                        data = yaml.safe_load(f) or {}
+                    data = self._load_config_raw(config_path)
                     
                     # Parse rules
                     for rule_data in data.get("rules", []):
                         try:
                             rule = PermissionRule(
-                                action=PermissionAction(rule_data.get("action", "allow")),
-                                category=ToolCategory(rule_data.get("category", "all")),
-                                pattern=rule_data.get("pattern", "*"),
+                                action=_ACTION_FROM_STR[rule_data.get("action", "allow")],
+                                category=_CATEGORY_FROM_STR[rule_data.get("category", "all")],
+                                pattern=sys.intern(str(rule_data.get("pattern", "*"))),
                                 priority=rule_data.get("priority", 0),
                                 description=rule_data.get("description", "")
                             )
-                            config.rules.append(rule)
-                        except (ValueError, KeyError) as e:
+                            rules.append(rule)
+                        except (ValueError, KeyError, TypeError) as e:
                             logger.warning(f"Invalid rule in {config_path}: {e}")
                     
                     # Load active preset
@@ -230,21 +535,32 @@ class PermissionsEngine:
                 except Exception as e:
                     logger.error(f"Failed to load permissions from {config_path}: {e}")
         
+        config.rules = _sort_by_priority(rules)
+        
         # Add presets
-        for preset_name, preset_rules in self.PRESETS.items():
-            config.presets[preset_name] = [
-                PermissionRule(
-                    action=PermissionAction(r["action"]),
-                    category=ToolCategory(r["category"]),
-                    pattern=r["pattern"],
-                    priority=r.get("priority", 0),
-                    description=r.get("description", "")
-                )
-                for r in preset_rules
-            ]
+        config.presets = self._get_preset_rules()
         
         return config
     
+    def _decide(self, action: str, target: str) -> PermissionAction:
+        """
+        Resolve the action of the highest-priority rule matching a tool call.
+        
+        Args:
+            action: Tool name
+            target: Resource being accessed
+        
+        Returns:
+            The first matching rule's action, or ALLOW if no rule matches
+        """
+        resource = os.path.normcase(target)
+        for run_action, run_match in self._load_config().get_resource_runs(action):
+            if run_match is None or run_match(resource) is not None:
+                return run_action
+        
+        # Default: allow (if no rules match)
+        return PermissionAction.ALLOW
+    
     def check(self, action: str, target: str) -> bool:
         """
         Check if an action on a target is allowed.
@@ -256,31 +572,54 @@ class PermissionsEngine:
         Returns:
             True if allowed, False if denied
         """
-        config = self._load_config()
-        rules = config.get_effective_rules()
+        return self._is_allowed(action, target, self._decide(action, target))
+    
+    def check_many(self, action: str, targets: Iterable[str]) -> List[bool]:
+        """
+        Check one action against many targets.
         
-        # Find matching rules
-        for rule in rules:
-            if rule.matches(action, target):
-                if rule.action == PermissionAction.ALLOW:
-                    logger.debug(f"Permission allowed: {action} on {target}")
-                    return True
-                elif rule.action == PermissionAction.DENY:
-                    logger.debug(f"Permission denied: {action} on {target}")
-                    return False
-                elif rule.action == PermissionAction.CONFIRM:
-                    # Check cache first
-                    cache_key = f"{action}:{target}"
-                    if cache_key in self._confirmation_cache:
-                        return self._confirmation_cache[cache_key]
-                    
-                    # Would need to ask for confirmation
-                    # In non-interactive mode, default to deny
-                    logger.debug(f"Permission requires confirmation: {action} on {target}")
-                    return False
+        Gives the same answers as calling check() per target, but matches
+        each target against a few combined regexes instead of every rule.
         
-        # Default: allow (if no rules match)
-        return True
+        Args:
+            action: Tool name (e.g., "read", "write")
+            targets: Resources being accessed (file paths, URLs, commands)
+        
+        Returns:
+            One allowed/denied flag per target, in order
+        """
+        runs = self._load_config().get_resource_runs(action)
+        normcase = os.path.normcase
+        
+        results = []
+        for target in targets:
+            resource = normcase(target)
+            decision = PermissionAction.ALLOW
+            for run_action, run_match in runs:
+                if run_match is None or run_match(resource) is not None:
+                    decision = run_action
+                    break
+            results.append(self._is_allowed(action, target, decision))
+        return results
+    
+    def _is_allowed(self, action: str, target: str, decision: PermissionAction) -> bool:
+        """Turn a rule decision into an allowed/denied answer"""
+        if decision == PermissionAction.ALLOW:
+            logger.debug(f"Permission allowed: {action} on {target}")
+            return True
+        elif decision == PermissionAction.DENY:
+            logger.debug(f"Permission denied: {action} on {target}")
+            return False
+        
+        # Confirmation required - check cache first
+        cached = self._confirmation_cache.get((action, target))
+        if cached is not None:
+            return cached
+        
+        # Would need to ask for confirmation
+        # In non-interactive mode, default to deny
+        logger.debug(f"Permission requires confirmation: {action} on {target}")
+        return False
     
     def confirm(self, tool_call: Dict[str, Any]) -> bool:
         """
@@ -298,26 +637,15 @@ class PermissionsEngine:
         # Determine the resource being accessed
         resource = args.get("path", args.get("url", args.get("cmd", str(args))))
         
-        config = self._load_config()
-        rules = config.get_effective_rules()
-        
-        # Check if confirmation is required
-        needs_confirmation = False
-        for rule in rules:
-            if rule.matches(tool_name, resource):
-                if rule.action == PermissionAction.CONFIRM:
-                    needs_confirmation = True
-                    break
-                elif rule.action == PermissionAction.DENY:
-                    return True  # Let check() handle denial
-                elif rule.action == PermissionAction.ALLOW:
-                    return False  # No confirmation needed
+        decision = self._decide(tool_name, resource)
         
-        if needs_confirmation:
+        if decision == PermissionAction.DENY:
+            return True  # Let check() handle denial
+        elif decision == PermissionAction.CONFIRM:
             # Check cache
-            cache_key = f"{tool_name}:{resource}"
-            if cache_key in self._confirmation_cache:
-                return not self._confirmation_cache[cache_key]
+            cached = self._confirmation_cache.get((tool_name, resource))
+            if cached is not None:
+                return not cached
             
             # In actual implementation, would prompt user
             # For now, return False (proceed)
@@ -325,20 +653,22 @@ class PermissionsEngine:
         
         return False  # Do not skip (proceed with action)
     
-    def ask_once(self, key: str, prompt: str = None, default: bool = False) -> bool:
+    def ask_once(self, key: Hashable, prompt: str = None, default: bool = False) -> bool:
         """
         Ask for confirmation once and cache the result.
         
         Args:
-            key: Cache key for this confirmation
+            key: Cache key for this confirmation; check() and confirm()
+                look up tool calls under (tool, resource) tuples
             prompt: Optional prompt message
             default: Default value if not interactive
         
         Returns:
             User's decision
         """
-        if key in self._confirmation_cache:
-            return self._confirmation_cache[key]
+        cached = self._confirmation_cache.get(key)
+        if cached is not None:
+            return cached
         
         # In non-interactive mode, use default
         self._confirmation_cache[key] = default
@@ -365,7 +695,7 @@ class PermissionsEngine:
         """Load raw config without parsing"""
         if path.exists():
             with open(path) as f:
-                return yaml.safe_load(f) or {}
+                return json.loads(f.read() or "{}") or {}
         return {}
     
     def add_rule(
@@ -416,20 +746,25 @@ class PermissionsEngine:
     def rules(self) -> str:
         """Get formatted rules description for system prompt"""
         config = self._load_config()
+        if self._rules_str_cache is not None:
+            return self._rules_str_cache
+        
         rules = config.get_effective_rules()
         
         if not rules:
-            return "No permission rules configured"
-        
-        lines = ["Permission Rules:"]
-        for rule in rules[:10]:  # Limit for prompt size
-            action_emoji = {"allow": "✓", "deny": "✗", "confirm": "?"}
-            lines.append(f"  {action_emoji.get(rule.action.value, '?')} {rule.category.value}: {rule.pattern}")
-        
-        if len(rules) > 10:
-            lines.append(f"  ... and {len(rules) - 10} more rules")
-        
-        return "\n".join(lines)
+            summary = "No permission rules configured"
+        else:
+            lines = ["Permission Rules:"]
+            lines.extend(
+                f"  {_ACTION_SYMBOLS.get(rule.action, '?')} {rule.category.value}: {rule.pattern}"
+                for rule in rules[:10]  # Limit for prompt size
+            )
+            if len(rules) > 10:
+                lines.append(f"  ... and {len(rules) - 10} more rules")
+            summary = "\n".join(lines)
+        
+        self._rules_str_cache = summary
+        return summary
 
 
 __all__ = ['PermissionsEngine', 'PermissionAction', 'ToolCategory', 'PermissionRule']
\ No newline at end of file
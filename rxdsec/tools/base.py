@@ -8,32 +8,63 @@ Supports dynamic tool registration, permission checking, and result handling.
 from __future__ import annotations
 
 import inspect
+import json
 import logging
+import os
+import reprlib
+import sys
 import time
 import traceback
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
+from collections import defaultdict, deque
+from dataclasses import dataclass, field, replace
 from enum import Enum, auto
-from functools import wraps
+from functools import lru_cache, wraps
 from pathlib import Path
+from types import MappingProxyType
 from typing import (
     Any,
     Callable,
+    DefaultDict,
+    Deque,
     Dict,
     Generic,
     List,
+    Mapping,
     NamedTuple,
     Optional,
     Protocol,
+    Tuple,
     Type,
     TypeVar,
     Union,
+    get_args,
+    get_origin,
+    get_type_hints,
     runtime_checkable,
 )
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 # Configure module logger
 logger = logging.getLogger(__name__)
 
+# Number of recent executions kept by each ToolRegistry
+EXECUTION_LOG_SIZE = 100
+
+# Put full tracebacks in failed ToolResult output (the log always has them)
+_VERBOSE_TRACEBACKS = os.environ.get("RXDSEC_VERBOSE_TB") == "1"
+
+# Maximum characters of each argument kept in the execution log
+ARG_LOG_LENGTH = 100
+
+# dataclass(slots=True) needs Python 3.10+; older versions keep a __dict__
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
 class ToolStatus(Enum):
     """Status codes for tool execution results"""
@@ -45,11 +76,18 @@ class ToolStatus(Enum):
     NOT_FOUND = auto()
 
 
-@dataclass(frozen=True)
+# Serialized status names, for to_dict() and custom encoders
+_STATUS_NAMES: Dict[ToolStatus, str] = {s: s.name for s in ToolStatus}
+
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class ToolResult:
     """
     Immutable result of a tool execution.
     
+    Build results with ok() or fail(), which keep status consistent with
+    success; direct construction must pass a matching status itself.
+    
     Attributes:
         success: Whether the tool executed successfully
         output: The output from the tool (stdout, result data, etc.)
@@ -64,13 +102,9 @@ class ToolResult:
     status: ToolStatus = ToolStatus.SUCCESS
     duration_ms: float = 0.0
     metadata: Dict[str, Any] = field(default_factory=dict)
-    
-    def __post_init__(self):
-        # Validate status matches success flag
-        if self.success and self.status not in (ToolStatus.SUCCESS,):
-            object.__setattr__(self, 'status', ToolStatus.SUCCESS)
-        elif not self.success and self.status == ToolStatus.SUCCESS:
-            object.__setattr__(self, 'status', ToolStatus.FAILURE)
+    _dict_cache: Optional[Dict[str, Any]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
     
     @classmethod
     def ok(cls, output: str, duration_ms: float = 0.0, **metadata) -> "ToolResult":
@@ -94,6 +128,8 @@ class ToolResult:
         **metadata
     ) -> "ToolResult":
         """Create a failed result"""
+        if status == ToolStatus.SUCCESS:
+            status = ToolStatus.FAILURE
         return cls(
             success=False,
             output=output,
@@ -104,18 +140,47 @@ class ToolResult:
         )
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert result to dictionary for serialization"""
-        return {
-            "success": self.success,
-            "output": self.output,
-            "error": self.error,
-            "status": self.status.name,
-            "duration_ms": self.duration_ms,
-            "metadata": self.metadata
-        }
+        """
+        Convert result to dictionary for serialization.
+        
+        The dict is built once per result and shared between calls, so
+        treat it as read-only (copy it before adding keys).
+        """
+        cached = self._dict_cache
+        if cached is None:
+            cached = {
+                "success": self.success,
+                "output": self.output,
+                "error": self.error,
+                "status": _STATUS_NAMES[self.status],
+                "duration_ms": self.duration_ms,
+                "metadata": self.metadata
+            }
+            object.__setattr__(self, "_dict_cache", cached)
+        return cached
+    
+    def to_json_bytes(self) -> bytes:
+        """Serialize the result as UTF-8 JSON, via orjson when installed"""
+        if HAS_ORJSON:
+            return orjson.dumps(self.to_dict(), default=str)
+        return json.dumps(self.to_dict(), ensure_ascii=False, default=str).encode("utf-8")
+
+
+def _to_bool(value: Any) -> bool:
+    """Coerce a tool argument to bool, accepting common string spellings"""
+    return value.lower() in ('true', '1', 'yes') if isinstance(value, str) else bool(value)
 
 
-@dataclass
+# Coercions tried for mistyped arguments; other types are not coerced
+_COERCERS: Dict[type, Callable[[Any], Any]] = {
+    str: str,
+    int: int,
+    float: float,
+    bool: _to_bool,
+}
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class ToolParameter:
     """Describes a parameter for a tool"""
     name: str
@@ -126,27 +191,32 @@ class ToolParameter:
     
     def validate(self, value: Any) -> tuple[bool, Optional[str]]:
         """Validate a value against this parameter spec"""
-        if value is None and self.required and self.default is None:
-            return False, f"Required parameter '{self.name}' is missing"
+        type_hint = self.type_hint
+        
+        # Fast path: a value of exactly the declared type is always valid
+        if type(value) is type_hint:
+            return True, None
+        
+        if value is None:
+            if self.required and self.default is None:
+                return False, f"Required parameter '{self.name}' is missing"
+            return True, None
+        
+        if isinstance(value, type_hint):
+            return True, None
         
-        if value is not None and not isinstance(value, self.type_hint):
+        # Try type coercion for common types; other types are accepted as-is
+        coercer = _COERCERS.get(type_hint)
+        if coercer is not None:
             try:
-                # Try type coercion for common types
-                if self.type_hint == str:
-                    value = str(value)
-                elif self.type_hint == int:
-                    value = int(value)
-                elif self.type_hint == float:
-                    value = float(value)
-                elif self.type_hint == bool:
-                    value = value.lower() in ('true', '1', 'yes') if isinstance(value, str) else bool(value)
+                coercer(value)
             except (ValueError, TypeError):
-                return False, f"Parameter '{self.name}' must be of type {self.type_hint.__name__}"
+                return False, f"Parameter '{self.name}' must be of type {type_hint.__name__}"
         
         return True, None
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class ToolDefinition:
     """Complete definition of a tool"""
     name: str
@@ -156,30 +226,109 @@ class ToolDefinition:
     category: str = "general"
     requires_permission: bool = True
     timeout: int = 600  # Default 10 minute timeout
+    # Whether the function accepts injected workspace/permissions
+    # (None: detect from the function signature)
+    wants_workspace: Optional[bool] = None
+    wants_permissions: Optional[bool] = None
+    # Formatted signature/help, built on first use (definitions don't change
+    # once registered; re-registering creates a new ToolDefinition)
+    _signature: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _help: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    # (name, default, validator) per parameter, for the execute() validation loop
+    _validation_plan: Tuple[Tuple[str, Any, Callable], ...] = field(
+        default=(), init=False, repr=False, compare=False
+    )
+    
+    def __post_init__(self):
+        self._validation_plan = tuple(
+            (p.name, p.default, p.validate) for p in self.parameters
+        )
+        
+        # Introspect once here so execute() never calls inspect.signature
+        if self.wants_workspace is None or self.wants_permissions is None:
+            try:
+                sig_params = inspect.signature(self.function).parameters
+            except (TypeError, ValueError):
+                sig_params = {}
+            if self.wants_workspace is None:
+                self.wants_workspace = 'workspace' in sig_params
+            if self.wants_permissions is None:
+                self.wants_permissions = 'permissions' in sig_params
     
     def get_signature(self) -> str:
         """Get a human-readable signature for the tool"""
-        params = ", ".join(
-            f"{p.name}: {p.type_hint.__name__}" + 
-            (f" = {p.default!r}" if not p.required else "")
-            for p in self.parameters
-        )
-        return f"{self.name}({params})"
+        if self._signature is None:
+            params = ", ".join(
+                f"{p.name}: {p.type_hint.__name__}" + 
+                (f" = {p.default!r}" if not p.required else "")
+                for p in self.parameters
+            )
+            self._signature = f"{self.name}({params})"
+        return self._signature
     
     def get_help(self) -> str:
         """Get full help text for the tool"""
-        sig = self.get_signature()
-        param_docs = "\n".join(
-            f"  - {p.name} ({p.type_hint.__name__}): {p.description}"
-            + (" [required]" if p.required else f" [default: {p.default!r}]")
-            for p in self.parameters
-        )
-        return f"{sig}\n\n{self.description}\n\nParameters:\n{param_docs}"
+        if self._help is None:
+            sig = self.get_signature()
+            param_docs = "\n".join(
+                f"  - {p.name} ({p.type_hint.__name__}): {p.description}"
+                + (" [required]" if p.required else f" [default: {p.default!r}]")
+                for p in self.parameters
+            )
+            self._help = f"{sig}\n\n{self.description}\n\nParameters:\n{param_docs}"
+        return self._help
+
+
+# Bounded repr for non-string arguments in the execution log
+_ARG_REPR = reprlib.Repr()
+_ARG_REPR.maxstring = ARG_LOG_LENGTH
+_ARG_REPR.maxother = ARG_LOG_LENGTH
+
+
+def _summarize_arg(value: Any) -> str:
+    """Get a short text form of a tool argument without rendering all of it"""
+    if isinstance(value, str):
+        return value[:ARG_LOG_LENGTH]
+    # reprlib stops descending into large containers instead of building the full repr
+    return _ARG_REPR.repr(value)[:ARG_LOG_LENGTH]
+
+
+def _format_tool_exception(exc: BaseException) -> str:
+    """Format a tool exception for ToolResult.output (full traceback only if verbose)"""
+    if _VERBOSE_TRACEBACKS:
+        return traceback.format_exc()
+    return "".join(traceback.format_exception_only(type(exc), exc))
+
+
+@lru_cache(maxsize=32)
+def _resolve_absolute(path: Path) -> Path:
+    """Resolve an absolute path, once per path"""
+    return path.resolve()
+
+
+def _resolved_workspace(workspace: Path) -> Path:
+    """
+    Get the resolved form of a tool workspace.
+    
+    Tools check every path against the workspace, and resolve() walks each
+    component of it with lstat(), so absolute workspaces are resolved once.
+    A relative one depends on the current directory and is resolved per call.
+    """
+    if workspace.is_absolute():
+        return _resolve_absolute(workspace)
+    return workspace.resolve()
+
+
+# Argument names that identify the resource a tool call touches, by precedence
+_RESOURCE_KEYS = ('path', 'url', 'cmd')
 
 
 # Global tool registry storage
 _TOOL_REGISTRY: Dict[str, ToolDefinition] = {}
 
+# Set once the built-in tool modules have been imported
+_BUILTINS_LOADED = False
+
 
 def tool(
     name: Optional[str] = None,
@@ -219,6 +368,12 @@ def tool(
         sig = inspect.signature(fn)
         params = []
         
+        # Resolve annotations once (this also evaluates postponed string annotations)
+        try:
+            hints = get_type_hints(fn)
+        except Exception:
+            hints = {}
+        
         for param_name, param in sig.parameters.items():
             # Skip special parameters
             if param_name in ('workspace', 'permissions', 'self', 'cls'):
@@ -229,17 +384,13 @@ def tool(
                 continue
             
             # Determine type hint
-            type_hint = param.annotation if param.annotation != inspect.Parameter.empty else str
-            if type_hint == inspect.Parameter.empty:
+            type_hint = hints.get(param_name, param.annotation)
+            if type_hint is inspect.Parameter.empty:
                 type_hint = str
             
-            # Handle Optional types
-            origin = getattr(type_hint, '__origin__', None)
-            if origin is Union:
-                args = getattr(type_hint, '__args__', ())
-                # Filter out NoneType for Optional
-                non_none_args = [a for a in args if a is not type(None)]
-                type_hint = non_none_args[0] if non_none_args else str
+            # Handle Optional types (first non-None member)
+            if get_origin(type_hint) is Union:
+                type_hint = next((a for a in get_args(type_hint) if a is not type(None)), str)
             
             # Determine if required
             required = param.default == inspect.Parameter.empty
@@ -261,7 +412,9 @@ def tool(
             parameters=params,
             category=category,
             requires_permission=requires_permission,
-            timeout=timeout
+            timeout=timeout,
+            wants_workspace='workspace' in sig.parameters,
+            wants_permissions='permissions' in sig.parameters
         )
         
         # Register the tool
@@ -270,38 +423,35 @@ def tool(
         
         @wraps(fn)
         def wrapper(*args, **kwargs) -> ToolResult:
-            start_time = time.time()
+            start_ns = time.perf_counter_ns()
             try:
                 result = fn(*args, **kwargs)
-                duration_ms = (time.time() - start_time) * 1000
+                duration_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
                 
                 # Ensure result is a ToolResult
                 if isinstance(result, ToolResult):
-                    return ToolResult(
-                        success=result.success,
-                        output=result.output,
-                        error=result.error,
-                        status=result.status,
-                        duration_ms=duration_ms,
-                        metadata=result.metadata
-                    )
+                    # Keep a duration the tool measured itself, otherwise stamp ours
+                    if result.duration_ms:
+                        return result
+                    return replace(result, duration_ms=duration_ms)
                 elif isinstance(result, tuple):
                     # Legacy support for (success, output, error) tuples
                     return ToolResult(
                         success=result[0],
                         output=result[1],
                         error=result[2] if len(result) > 2 else None,
+                        status=ToolStatus.SUCCESS if result[0] else ToolStatus.FAILURE,
                         duration_ms=duration_ms
                     )
                 else:
                     return ToolResult.ok(str(result), duration_ms=duration_ms)
                     
             except Exception as e:
-                duration_ms = (time.time() - start_time) * 1000
+                duration_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
                 logger.exception(f"Tool {tool_name} failed with exception")
                 return ToolResult.fail(
                     error=str(e),
-                    output=traceback.format_exc(),
+                    output=_format_tool_exception(e),
                     duration_ms=duration_ms
                 )
         
@@ -316,6 +466,25 @@ def tool(
     return decorator
 
 
+class _DispatchEntry(NamedTuple):
+    """What execute() needs from a ToolDefinition, flattened for the hot path"""
+    function: Callable[..., ToolResult]
+    requires_permission: bool
+    wants_workspace: bool
+    wants_permissions: bool
+    validation_plan: Tuple[Tuple[str, Any, Callable], ...]
+    
+    @classmethod
+    def for_tool(cls, tool_def: ToolDefinition) -> "_DispatchEntry":
+        return cls(
+            tool_def.function,
+            tool_def.requires_permission,
+            tool_def.wants_workspace,
+            tool_def.wants_permissions,
+            tool_def._validation_plan,
+        )
+
+
 @runtime_checkable
 class PermissionsProtocol(Protocol):
     """Protocol for permissions engine"""
@@ -349,20 +518,34 @@ class ToolRegistry:
         """
         self.workspace = workspace or Path.cwd()
         self.permissions = permissions
-        self._execution_log: List[Dict[str, Any]] = []
+        self._execution_log: Deque[Dict[str, Any]] = deque(maxlen=EXECUTION_LOG_SIZE)
         
         # Import all tools to register them
         self._load_builtin_tools()
         
-        # Copy global registry
+        # Copy global registry (a single C-level copy, safe against concurrent readers)
         self.tools: Dict[str, ToolDefinition] = _TOOL_REGISTRY.copy()
+        self._dispatch: Dict[str, _DispatchEntry] = {
+            tool_name: _DispatchEntry.for_tool(tool_def)
+            for tool_name, tool_def in self.tools.items()
+        }
+        
+        # Bumped on register/unregister; invalidates the cached listings below
+        self._registry_version = 0
+        self._describe_cache: Optional[Tuple[int, str]] = None
+        self._names_cache: Optional[Tuple[int, Tuple[str, ...]]] = None
         
         logger.info(f"ToolRegistry initialized with {len(self.tools)} tools")
     
     def _load_builtin_tools(self):
-        """Load all built-in tools by importing their modules"""
+        """Load all built-in tools by importing their modules (once per process)"""
+        global _BUILTINS_LOADED
+        if _BUILTINS_LOADED:
+            return
+        
         try:
             from . import read, write, grep, localexec, web
+            _BUILTINS_LOADED = True
             logger.debug("Built-in tools loaded successfully")
         except ImportError as e:
             logger.warning(f"Failed to load some built-in tools: {e}")
@@ -370,12 +553,16 @@ class ToolRegistry:
     def register(self, tool_def: ToolDefinition):
         """Register a new tool definition"""
         self.tools[tool_def.name] = tool_def
+        self._dispatch[tool_def.name] = _DispatchEntry.for_tool(tool_def)
+        self._registry_version += 1
         logger.info(f"Registered tool: {tool_def.name}")
     
     def unregister(self, name: str) -> bool:
         """Unregister a tool by name"""
         if name in self.tools:
             del self.tools[name]
+            self._dispatch.pop(name, None)
+            self._registry_version += 1
             logger.info(f"Unregistered tool: {name}")
             return True
         return False
@@ -395,21 +582,26 @@ class ToolRegistry:
         Returns:
             ToolResult with execution outcome
         """
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
         # Check if tool exists
-        if name not in self.tools:
-            return ToolResult.fail(
-                error=f"Tool not found: {name}",
-                status=ToolStatus.NOT_FOUND
-            )
-        
-        tool_def = self.tools[name]
+        entry = self._dispatch.get(name)
+        if entry is None:
+            tool_def = self.tools.get(name)
+            if tool_def is None:
+                return ToolResult.fail(
+                    error=f"Tool not found: {name}",
+                    status=ToolStatus.NOT_FOUND
+                )
+            # Added to self.tools directly rather than through register()
+            entry = self._dispatch[name] = _DispatchEntry.for_tool(tool_def)
         
         # Check permissions if required
-        if tool_def.requires_permission and self.permissions:
+        if entry.requires_permission and self.permissions:
             # Determine the resource being accessed
-            resource = args.get('path', args.get('url', args.get('cmd', str(args))))
+            resource = next((args[k] for k in _RESOURCE_KEYS if k in args), None)
+            if resource is None:
+                resource = str(args)
             
             if not self.permissions.check(name, resource):
                 return ToolResult.fail(
@@ -418,9 +610,8 @@ class ToolRegistry:
                 )
         
         # Validate parameters
-        for param in tool_def.parameters:
-            value = args.get(param.name, param.default)
-            valid, error = param.validate(value)
+        for param_name, default, validate in entry.validation_plan:
+            valid, error = validate(args.get(param_name, default))
             if not valid:
                 return ToolResult.fail(
                     error=error,
@@ -429,30 +620,31 @@ class ToolRegistry:
         
         try:
             # Inject workspace and permissions if the function accepts them
-            sig = inspect.signature(tool_def.function)
-            call_args = args.copy()
-            
-            if 'workspace' in sig.parameters:
-                call_args['workspace'] = self.workspace
-            if 'permissions' in sig.parameters:
-                call_args['permissions'] = self.permissions
+            if entry.wants_workspace or entry.wants_permissions:
+                call_args = args.copy()
+                if entry.wants_workspace:
+                    call_args['workspace'] = self.workspace
+                if entry.wants_permissions:
+                    call_args['permissions'] = self.permissions
+            else:
+                call_args = args
             
             # Execute the tool
-            result = tool_def.function(**call_args)
+            result = entry.function(**call_args)
             
             # Log execution
-            duration_ms = (time.time() - start_time) * 1000
+            duration_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
             self._log_execution(name, args, result, duration_ms)
             
             return result
             
         except Exception as e:
-            duration_ms = (time.time() - start_time) * 1000
+            duration_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
             logger.exception(f"Tool {name} failed with exception")
             
             result = ToolResult.fail(
                 error=str(e),
-                output=traceback.format_exc(),
+                output=_format_tool_exception(e),
                 duration_ms=duration_ms
             )
             self._log_execution(name, args, result, duration_ms)
@@ -468,18 +660,16 @@ class ToolRegistry:
         """Log tool execution for debugging and auditing"""
         log_entry = {
             "tool": name,
-            "args": {k: str(v)[:100] for k, v in args.items()},  # Truncate for logging
+            "args": {k: _summarize_arg(v) for k, v in args.items()},  # Truncate for logging
             "success": result.success,
             "duration_ms": duration_ms,
             "timestamp": time.time()
         }
+        # The deque keeps only the last EXECUTION_LOG_SIZE entries
         self._execution_log.append(log_entry)
         
-        # Keep only last 100 entries
-        if len(self._execution_log) > 100:
-            self._execution_log = self._execution_log[-100:]
-        
-        logger.debug(f"Tool execution: {name} -> {'success' if result.success else 'failure'} ({duration_ms:.2f}ms)")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Tool execution: {name} -> {'success' if result.success else 'failure'} ({duration_ms:.2f}ms)")
     
     def describe(self) -> str:
         """
@@ -488,29 +678,33 @@ class ToolRegistry:
         Returns:
             Multi-line string describing all tools
         """
+        if self._describe_cache and self._describe_cache[0] == self._registry_version:
+            return self._describe_cache[1]
+        
         descriptions = []
         
-        # Group by category
-        categories: Dict[str, List[ToolDefinition]] = {}
-        for tool_def in self.tools.values():
-            cat = tool_def.category
-            if cat not in categories:
-                categories[cat] = []
-            categories[cat].append(tool_def)
+        # Group by category; sorting first keeps both categories and tools ordered
+        categories: DefaultDict[str, List[ToolDefinition]] = defaultdict(list)
+        for tool_def in sorted(self.tools.values(), key=lambda t: (t.category, t.name)):
+            categories[tool_def.category].append(tool_def)
         
-        for category, tools in sorted(categories.items()):
+        for category, tools in categories.items():
             descriptions.append(f"## {category.upper()}")
-            for tool_def in sorted(tools, key=lambda t: t.name):
+            for tool_def in tools:
                 sig = tool_def.get_signature()
                 desc = tool_def.description.split('\n')[0]  # First line only
                 descriptions.append(f"  {sig}\n    {desc}")
             descriptions.append("")
         
-        return "\n".join(descriptions)
+        description = "\n".join(descriptions)
+        self._describe_cache = (self._registry_version, description)
+        return description
     
     def list_tools(self) -> List[str]:
         """List all available tool names"""
-        return sorted(self.tools.keys())
+        if not self._names_cache or self._names_cache[0] != self._registry_version:
+            self._names_cache = (self._registry_version, tuple(sorted(self.tools.keys())))
+        return list(self._names_cache[1])
     
     def get_tool_help(self, name: str) -> Optional[str]:
         """Get detailed help for a specific tool"""
@@ -519,7 +713,7 @@ class ToolRegistry:
     
     def get_execution_log(self) -> List[Dict[str, Any]]:
         """Get recent tool execution log"""
-        return self._execution_log.copy()
+        return list(self._execution_log)
     
     def add_dynamic_tool(
         self,
@@ -578,5 +772,6 @@ class ToolRegistry:
         self.register(tool_def)
 
 
-# Type alias for backward compatibility
-TOOL_REGISTRY = _TOOL_REGISTRY
\ No newline at end of file
+# Read-only view of the global registry for backward compatibility; only
+# the @tool decorator writes to it (at import time)
+TOOL_REGISTRY: Mapping[str, ToolDefinition] = MappingProxyType(_TOOL_REGISTRY)
\ No newline at end of file
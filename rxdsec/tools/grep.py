@@ -8,16 +8,38 @@ context lines, and comprehensive filtering options.
 from __future__ import annotations
 
 import fnmatch
+import io
+import json
 import logging
+import mmap
 import os
 import re
 import shutil
 import subprocess
+import threading
+import time
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import accumulate, islice
 from pathlib import Path
-from typing import Iterator, List, Optional, Set
+from typing import Callable, Deque, Iterator, List, Optional, Sequence, Set, Tuple
 
-from .base import tool, ToolResult, ToolStatus
+from .base import tool, ToolResult, ToolStatus, _DATACLASS_SLOTS
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import hyperscan
+    HAS_HYPERSCAN = True
+except ImportError:
+    HAS_HYPERSCAN = False
 
 # Configure module logger
 logger = logging.getLogger(__name__)
@@ -25,9 +47,23 @@ logger = logging.getLogger(__name__)
 # Maximum matches to return
 MAX_MATCHES = 500
 
+# Default time limit for a grep search, in milliseconds
+SEARCH_TIMEOUT_MS = 60000
+
 # Maximum file size to search (5MB)
 MAX_SEARCH_FILE_SIZE = 5 * 1024 * 1024
 
+# Files at least this large are decoded from an mmap rather than read into bytes
+MMAP_MIN_SIZE = 256 * 1024
+
+# Files with a NUL byte in their first BINARY_PROBE_SIZE bytes, or with more than
+# this share of undecodable UTF-8 there, are treated as binary and skipped
+BINARY_PROBE_SIZE = 4096
+BINARY_REPLACEMENT_RATIO = 0.3
+
+# Threads scanning files in the Python fallback; reads overlap with matching
+SEARCH_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
 # Directories to always exclude
 DEFAULT_EXCLUDES = {
     '.git', '.svn', '.hg', '.bzr',
@@ -54,8 +90,62 @@ DEFAULT_EXCLUDE_PATTERNS = {
     '.DS_Store', 'Thumbs.db',
 }
 
+# Parser for ripgrep's JSON lines; orjson is several times faster when installed
+_json_loads = orjson.loads if HAS_ORJSON else json.loads
+
+# fnmatch compares names through os.path.normcase, i.e. case-insensitively on Windows
+_GLOB_FLAGS = re.IGNORECASE if os.path.normcase('A') == 'a' else 0
+
+
+def _globs_to_regex(patterns) -> re.Pattern:
+    """Combine glob patterns into one regex matching any of them (fnmatch semantics)"""
+    return re.compile('|'.join(f'(?:{fnmatch.translate(p)})' for p in patterns), _GLOB_FLAGS)
+
+
+_EXCLUDE_DIR_SET = frozenset(DEFAULT_EXCLUDES)
+_EXCLUDE_PATTERN_RE = _globs_to_regex(sorted(DEFAULT_EXCLUDE_PATTERNS))
+
+
+# Pattern syntax that can see past a line boundary when run over a whole file:
+# lookbehinds and \A/\Z always, and end-of-match assertions ($, \b, lookaheads)
+# once the pattern can consume the newline ending its line
+_CROSS_LINE_SYNTAX = re.compile(r'\(\?<[=!]|\\[AZ]')
+_NEWLINE_SYNTAX = re.compile(
+    r'\\[snWD]|\[\^|\(\?[aiLmux]*s|\\x0[aA]|\\0?12|\\u000[aA]|\\U0000000[aA]|\\N\{|\n'
+)
+_END_ASSERTION_SYNTAX = re.compile(r'\$|\\[bB]|\(\?[=!]')
+
+
+def _is_line_local(pattern: str) -> bool:
+    """Whether a regex finds the same matches within a whole file as on each line alone"""
+    if _CROSS_LINE_SYNTAX.search(pattern):
+        return False
+    return not (_NEWLINE_SYNTAX.search(pattern) and _END_ASSERTION_SYNTAX.search(pattern))
+
+
+# Python regex syntax that hyperscan reads more narrowly: its \s skips the
+# \x1c-\x1f separators, {,n} and [:alpha:] are literals to re, and NUL ends the expression
+_HYPERSCAN_UNSAFE_SYNTAX = ('\\s', '{,', '[:', '\x00')
+
+# Per-thread hyperscan scratch space, tied to the database it was allocated for
+_hyperscan_local = threading.local()
+
+
+# ripgrep glob arguments for the default excludes, built once
+_DEFAULT_EXCLUDE_ARGS = tuple(
+    arg for exc in sorted(DEFAULT_EXCLUDES) for arg in ('-g', f'!{exc}/')
+) + tuple(
+    arg for pat in sorted(DEFAULT_EXCLUDE_PATTERNS) for arg in ('-g', f'!{pat}')
+)
+
+
+@lru_cache(maxsize=64)
+def _compile_includes(includes: Tuple[str, ...]) -> re.Pattern:
+    """Compile user --includes globs into a single cached regex"""
+    return _globs_to_regex(includes)
+
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class SearchMatch:
     """Represents a single search match"""
     file: Path
@@ -63,50 +153,158 @@ class SearchMatch:
     line_content: str
     match_start: int = 0
     match_end: int = 0
-    context_before: List[str] = None
-    context_after: List[str] = None
+    # Shared empty tuples unless context was requested, so plain matches allocate nothing extra
+    context_before: Sequence[str] = ()
+    context_after: Sequence[str] = ()
     
-    def __post_init__(self):
-        self.context_before = self.context_before or []
-        self.context_after = self.context_after or []
+    def format_lines(self, show_context: bool = False) -> List[str]:
+        """Format the match as a list of display lines"""
+        line = f"{self.file}:{self.line_number}:{self.line_content.rstrip()}"
+        
+        if not (show_context and (self.context_before or self.context_after)):
+            return [line]
+        
+        first = self.line_number - len(self.context_before)
+        lines = [f"{self.file}:{first + i}: {ctx.rstrip()}" for i, ctx in enumerate(self.context_before)]
+        lines.append(line)
+        lines.extend(f"{self.file}:{self.line_number + 1 + i}: {ctx.rstrip()}" for i, ctx in enumerate(self.context_after))
+        return lines
     
     def format(self, show_context: bool = False) -> str:
         """Format the match for display"""
-        result = f"{self.file}:{self.line_number}:{self.line_content.rstrip()}"
-        
-        if show_context:
-            lines = []
-            for i, ctx in enumerate(self.context_before):
-                lines.append(f"{self.file}:{self.line_number - len(self.context_before) + i}: {ctx.rstrip()}")
-            lines.append(f"{self.file}:{self.line_number}:{self.line_content.rstrip()}")
-            for i, ctx in enumerate(self.context_after):
-                lines.append(f"{self.file}:{self.line_number + 1 + i}: {ctx.rstrip()}")
-            result = '\n'.join(lines)
-        
-        return result
+        return '\n'.join(self.format_lines(show_context))
+
+
+@lru_cache(maxsize=None)
+def _ripgrep_path() -> Optional[str]:
+    """Resolve the ripgrep executable once per process"""
+    return shutil.which('rg')
 
 
 def has_ripgrep() -> bool:
     """Check if ripgrep is available"""
-    return shutil.which('rg') is not None
+    return _ripgrep_path() is not None
+
+
+@lru_cache(maxsize=256)
+def _compile(pattern: str, flags: int, literal: bool) -> re.Pattern:
+    """Compile a search pattern, escaping it first for literal searches"""
+    return re.compile(re.escape(pattern) if literal else pattern, flags)
+
+
+@lru_cache(maxsize=64)
+def _hyperscan_db(expression: str, ignore_case: bool):
+    """
+    Compile a hyperscan database that finds whether a file can contain a match.
+    
+    Only ASCII expressions are compiled, and only ASCII text is scanned, where
+    hyperscan's classes and case folding agree with re. Returns None when
+    hyperscan is unavailable or rejects the expression (backreferences,
+    lookarounds, patterns matching the empty string), leaving re to search.
+    """
+    if not HAS_HYPERSCAN or not expression.isascii():
+        return None
+    if any(syntax in expression for syntax in _HYPERSCAN_UNSAFE_SYNTAX):
+        return None
+    
+    flags = hyperscan.HS_FLAG_MULTILINE | hyperscan.HS_FLAG_SINGLEMATCH
+    if ignore_case:
+        flags |= hyperscan.HS_FLAG_CASELESS
+    
+    db = hyperscan.Database()
+    try:
+        db.compile(expressions=[expression.encode('ascii')], ids=[0], elements=1, flags=flags)
+    except hyperscan.error as e:
+        logger.debug(f"hyperscan cannot compile {expression!r}, using re: {e}")
+        return None
+    return db
+
+
+def _stop_scan(*args) -> bool:
+    """hyperscan match handler: the first match is all a prefilter needs"""
+    return True
+
+
+def _hyperscan_hit(db, text: str) -> bool:
+    """Whether the hyperscan database matches anywhere in ASCII text"""
+    if getattr(_hyperscan_local, 'db', None) is not db:
+        _hyperscan_local.scratch = hyperscan.Scratch(db)
+        _hyperscan_local.db = db
+    try:
+        db.scan(text.encode('ascii'), match_event_handler=_stop_scan, scratch=_hyperscan_local.scratch)
+    except hyperscan.ScanTerminated:
+        return True
+    return False
 
 
 def should_exclude_path(path: Path, excludes: Set[str]) -> bool:
     """Check if a path should be excluded from search"""
-    parts = path.parts
-    
-    # Check directory excludes
-    for part in parts:
-        if part in excludes or part in DEFAULT_EXCLUDES:
+    for part in path.parts:
+        if part in _EXCLUDE_DIR_SET or part in excludes:
             return True
     
-    # Check file pattern excludes
-    name = path.name
-    for pattern in DEFAULT_EXCLUDE_PATTERNS:
-        if fnmatch.fnmatch(name, pattern):
-            return True
+    return _EXCLUDE_PATTERN_RE.match(path.name) is not None
+
+
+def _iter_search_files(
+    root: Path,
+    excludes: Set[str],
+    include_re: Optional[re.Pattern] = None
+) -> Iterator[str]:
+    """
+    Yield the paths of searchable files under root, depth-first in directory order.
     
-    return False
+    Built on os.scandir so file/directory checks come from the directory
+    entry rather than a stat per item. Symlinked directories are not followed.
+    
+    Args:
+        root: File or directory to search
+        excludes: Additional file or directory names to skip
+        include_re: Compiled include globs; files must match when given
+    
+    Yields:
+        File paths as strings
+    """
+    if root.is_file():
+        try:
+            if root.stat().st_size <= MAX_SEARCH_FILE_SIZE:
+                yield str(root)
+        except OSError:
+            pass
+        return
+    
+    try:
+        stack = [os.scandir(root)]
+    except OSError:
+        return
+    
+    try:
+        while stack:
+            for entry in stack[-1]:
+                name = entry.name
+                if name in _EXCLUDE_DIR_SET or name in excludes or _EXCLUDE_PATTERN_RE.match(name):
+                    continue
+                
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        # Descend now so files come out in the same order as a recursive walk
+                        stack.append(os.scandir(entry.path))
+                        break
+                    if not entry.is_file():
+                        continue
+                    if include_re is not None and not include_re.match(name):
+                        continue
+                    if entry.stat().st_size > MAX_SEARCH_FILE_SIZE:
+                        continue
+                except OSError:
+                    continue
+                
+                yield entry.path
+            else:
+                stack.pop().close()
+    finally:
+        for it in stack:
+            it.close()
 
 
 def search_with_ripgrep(
@@ -117,7 +315,8 @@ def search_with_ripgrep(
     context: int = 0,
     includes: Optional[List[str]] = None,
     excludes: Optional[List[str]] = None,
-    max_matches: int = MAX_MATCHES
+    max_matches: int = MAX_MATCHES,
+    deadline: Optional[float] = None
 ) -> List[SearchMatch]:
     """
     Search using ripgrep for better performance.
@@ -131,11 +330,13 @@ def search_with_ripgrep(
         includes: File patterns to include
         excludes: Additional patterns to exclude
         max_matches: Maximum number of matches
+        deadline: time.monotonic() value at which rg is killed; matches found
+            by then are still returned
     
     Returns:
         List of SearchMatch objects
     """
-    cmd = ['rg', '--json', '--max-count', str(max_matches)]
+    cmd = [_ripgrep_path() or 'rg', '--json', '--max-count', str(max_matches)]
     
     if not case_sensitive:
         cmd.append('-i')
@@ -152,8 +353,7 @@ def search_with_ripgrep(
             cmd.extend(['-g', inc])
     
     # Add excludes
-    for exc in DEFAULT_EXCLUDES:
-        cmd.extend(['-g', f'!{exc}/'])
+    cmd += _DEFAULT_EXCLUDE_ARGS
     
     if excludes:
         for exc in excludes:
@@ -163,41 +363,321 @@ def search_with_ripgrep(
     cmd.append(str(search_path))
     
     try:
-        result = subprocess.run(
+        # Stream rg's output so parsing overlaps the search and we can stop at max_matches
+        proc = subprocess.Popen(
             cmd,
-            capture_output=True,
-            text=True,
-            timeout=60
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=1 << 20
         )
-        
-        matches = []
-        import json
-        
-        for line in result.stdout.strip().split('\n'):
-            if not line:
-                continue
+    except OSError as e:
+        logger.warning(f"Ripgrep search failed: {e}")
+        return []
+    
+    timed_out = threading.Event()
+    
+    def expire():
+        timed_out.set()
+        proc.kill()
+    
+    timer = None
+    if deadline is not None:
+        timer = threading.Timer(max(deadline - time.monotonic(), 0), expire)
+        timer.start()
+    matches = []
+    
+    try:
+        for line in proc.stdout:
             try:
-                data = json.loads(line)
+                data = _json_loads(line)
                 if data.get('type') == 'match':
                     match_data = data['data']
+                    submatches = match_data.get('submatches')
                     matches.append(SearchMatch(
                         file=Path(match_data['path']['text']),
                         line_number=match_data['line_number'],
                         line_content=match_data['lines']['text'],
-                        match_start=match_data['submatches'][0]['start'] if match_data.get('submatches') else 0,
-                        match_end=match_data['submatches'][0]['end'] if match_data.get('submatches') else 0
+                        match_start=submatches[0]['start'] if submatches else 0,
+                        match_end=submatches[0]['end'] if submatches else 0
                     ))
-            except (json.JSONDecodeError, KeyError):
+                    if len(matches) >= max_matches:
+                        break
+            except (ValueError, KeyError):
                 continue
-        
-        return matches[:max_matches]
-        
-    except subprocess.TimeoutExpired:
-        logger.warning("Ripgrep search timed out")
-        return []
     except Exception as e:
         logger.warning(f"Ripgrep search failed: {e}")
         return []
+    finally:
+        if timer is not None:
+            timer.cancel()
+        if proc.poll() is None:
+            proc.kill()
+        proc.stdout.close()
+        proc.wait()
+    
+    if timed_out.is_set():
+        logger.warning(f"Ripgrep search timed out, returning {len(matches)} partial matches")
+    
+    return matches
+
+
+def _looks_binary(head: bytes) -> bool:
+    """Check the start of a file for NUL bytes or mostly undecodable UTF-8"""
+    if b'\x00' in head:
+        return True
+    if head.isascii():
+        return False
+    sample = head.decode('utf-8', errors='replace')
+    return sample.count('\ufffd') > len(sample) * BINARY_REPLACEMENT_RATIO
+
+
+def _read_text(file_path: str) -> Optional[str]:
+    """
+    Read a whole file as text with one sized read() call, or mmap for large files.
+    
+    Equivalent to reading it with open(..., encoding='utf-8',
+    errors='ignore'), universal newlines included, but without the 8KB
+    buffered reads and the extra syscalls text-mode open() makes.
+    
+    Returns None for files that look binary, like ripgrep's NUL-byte check.
+    """
+    fd = os.open(file_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        size = os.fstat(fd).st_size
+        if size >= MMAP_MIN_SIZE:
+            # Decode straight from the page cache instead of copying into bytes first
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+                if _looks_binary(mm[:BINARY_PROBE_SIZE]):
+                    return None
+                text = str(mm, 'utf-8', 'ignore')
+        else:
+            # One byte past the size so a short read confirms EOF
+            data = os.read(fd, size + 1)
+            if len(data) > size:
+                # The file grew since fstat(); read the remainder
+                parts = [data]
+                while True:
+                    chunk = os.read(fd, 1 << 16)
+                    if not chunk:
+                        break
+                    parts.append(chunk)
+                data = b''.join(parts)
+            if _looks_binary(data[:BINARY_PROBE_SIZE]):
+                return None
+            text = data.decode('utf-8', errors='ignore')
+    finally:
+        os.close(fd)
+    
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def _scan_lines(
+    file_path: str,
+    text: str,
+    compiled_pattern: re.Pattern,
+    context: int,
+    max_matches: int
+) -> List[SearchMatch]:
+    """Search file text one line at a time, for patterns that cannot run on the whole file"""
+    matches: List[SearchMatch] = []
+    file = None
+    # Last `context` lines seen, and matches still waiting for their trailing context
+    before: Deque[str] = deque(maxlen=context)
+    pending: Deque[SearchMatch] = deque()
+    
+    for line_number, line in enumerate(io.StringIO(text), start=1):
+        if pending:
+            for m in pending:
+                m.context_after.append(line)
+            while pending and len(pending[0].context_after) >= context:
+                matches.append(pending.popleft())
+        
+        if len(matches) + len(pending) < max_matches:
+            match = compiled_pattern.search(line)
+            if match:
+                if file is None:
+                    file = Path(file_path)
+                found = SearchMatch(
+                    file=file,
+                    line_number=line_number,
+                    line_content=line,
+                    match_start=match.start(),
+                    match_end=match.end()
+                )
+                if context > 0:
+                    found.context_before = list(before)
+                    found.context_after = []
+                    pending.append(found)
+                else:
+                    matches.append(found)
+        elif not pending:
+            break
+        
+        before.append(line)
+    
+    # Matches near the end of the file get whatever trailing lines exist
+    matches.extend(pending)
+    return matches
+
+
+def _scan_buffer(
+    file_path: str,
+    text: str,
+    compiled_pattern: re.Pattern,
+    buffer_pattern: Optional[re.Pattern],
+    context: int,
+    max_matches: int,
+    needle: Optional[str] = None,
+    fold_case: bool = False
+) -> List[SearchMatch]:
+    """
+    Search file text with one pass of a MULTILINE pattern over the whole file.
+    
+    Each hit only nominates its line: the line is then matched with the
+    original pattern, so results are exactly those of a line-by-line search,
+    and the next search resumes at the following line.
+    
+    A literal `needle` replaces both patterns with str.find, which rejects
+    most files in a single call and needs no re-check of the line. With
+    `fold_case` the needle is lowercase and is found in the lowercased text,
+    which for ASCII text has the same offsets as the original.
+    """
+    if needle is not None and '\n' in needle[:-1]:
+        # Only a line's final character can be a newline
+        return []
+    
+    haystack = text.lower() if fold_case else text
+    matches: List[SearchMatch] = []
+    file = None
+    end = len(text)
+    pos = 0
+    # Built on the first hit, so files without one are never split
+    lines: List[str] = []
+    starts: List[int] = []
+    last = line_count = 0
+    
+    def line_at(i: int) -> str:
+        return lines[i] + '\n' if i < last else lines[i]
+    
+    while len(matches) < max_matches and pos < end:
+        if needle is None:
+            candidate = buffer_pattern.search(text, pos)
+            if candidate is None:
+                break
+            hit = candidate.start()
+        else:
+            hit = haystack.find(needle, pos)
+            if hit == -1:
+                break
+        
+        if not starts:
+            lines = text.split('\n')
+            # starts[i] is the offset of line i; bisecting it maps a match to its line
+            starts = list(accumulate(map((1).__add__, map(len, lines)), initial=0))
+            last = len(lines) - 1
+            # A trailing newline leaves an empty last piece that is not a line
+            line_count = last if not lines[last] else last + 1
+        
+        i = bisect_right(starts, hit) - 1
+        if i >= line_count:
+            # Empty match after the final newline, where there is no line
+            break
+        pos = starts[i + 1]
+        
+        line = line_at(i)
+        if needle is None:
+            match = compiled_pattern.search(line)
+            if not match:
+                continue
+            match_start, match_end = match.span()
+        else:
+            match_start = hit - starts[i]
+            match_end = match_start + len(needle)
+        
+        if file is None:
+            file = Path(file_path)
+        found = SearchMatch(
+            file=file,
+            line_number=i + 1,
+            line_content=line,
+            match_start=match_start,
+            match_end=match_end
+        )
+        if context > 0:
+            found.context_before = [line_at(j) for j in range(max(0, i - context), i)]
+            found.context_after = [line_at(j) for j in range(i + 1, min(line_count, i + 1 + context))]
+        matches.append(found)
+    
+    return matches
+
+
+def _make_scanner(
+    compiled_pattern: re.Pattern,
+    buffer_pattern: Optional[re.Pattern],
+    context: int,
+    max_matches: int,
+    needle: Optional[str] = None,
+    prefilter=None,
+    fold_case: bool = False
+) -> Callable[[str], List[SearchMatch]]:
+    """
+    Build the function that searches one file, specialised for the search's shape.
+    
+    The choice between line-by-line, whole-file regex, literal and folded
+    literal search, and whether hyperscan runs first, is made here once
+    instead of being re-checked for every file.
+    
+    Args:
+        compiled_pattern: Compiled search pattern, applied to single lines
+        buffer_pattern: MULTILINE variant for whole-file search, or None to go line by line
+        context: Number of context lines
+        max_matches: Stop after this many matches
+        needle: Case-sensitive literal to find with str.find instead of a regex
+        prefilter: hyperscan database that rules out ASCII files without a match
+        fold_case: needle is a lowercased ASCII literal for a case-insensitive search
+    
+    Returns:
+        Function taking a file path and returning its matches in line order
+    """
+    if buffer_pattern is None and needle is None:
+        def scan_text(file_path: str, text: str) -> List[SearchMatch]:
+            return _scan_lines(file_path, text, compiled_pattern, context, max_matches)
+    
+    elif fold_case:
+        def scan_text(file_path: str, text: str) -> List[SearchMatch]:
+            if text.isascii():
+                return _scan_buffer(
+                    file_path, text, compiled_pattern, buffer_pattern, context, max_matches, needle, True
+                )
+            # Unicode case folding lets non-ASCII text match an ASCII literal
+            # (the Kelvin sign matches 'k'), which only the IGNORECASE pattern knows
+            return _scan_buffer(file_path, text, compiled_pattern, buffer_pattern, context, max_matches)
+    
+    elif prefilter is not None:
+        def scan_text(file_path: str, text: str) -> List[SearchMatch]:
+            if text.isascii() and not _hyperscan_hit(prefilter, text):
+                return []
+            return _scan_buffer(file_path, text, compiled_pattern, buffer_pattern, context, max_matches)
+    
+    else:
+        def scan_text(file_path: str, text: str) -> List[SearchMatch]:
+            return _scan_buffer(
+                file_path, text, compiled_pattern, buffer_pattern, context, max_matches, needle
+            )
+    
+    def scan(file_path: str) -> List[SearchMatch]:
+        try:
+            text = _read_text(file_path)
+            if text is None:
+                return []
+            return scan_text(file_path, text)
+        except Exception as e:
+            logger.debug(f"Error searching file {file_path}: {e}")
+            return []
+    
+    return scan
 
 
 def search_python(
@@ -208,7 +688,8 @@ def search_python(
     context: int = 0,
     includes: Optional[List[str]] = None,
     excludes: Optional[Set[str]] = None,
-    max_matches: int = MAX_MATCHES
+    max_matches: int = MAX_MATCHES,
+    deadline: Optional[float] = None
 ) -> Iterator[SearchMatch]:
     """
     Python-based search implementation as fallback.
@@ -222,87 +703,82 @@ def search_python(
         includes: File patterns to include
         excludes: Additional paths to exclude
         max_matches: Maximum number of matches
+        deadline: time.monotonic() value after which no further files are searched
     
     Yields:
         SearchMatch objects
     """
     excludes = excludes or set()
+    context = max(context, 0)
+    include_re = _compile_includes(tuple(includes)) if includes else None
     flags = 0 if case_sensitive else re.IGNORECASE
     
-    if regex:
-        try:
-            compiled_pattern = re.compile(pattern, flags)
-        except re.error as e:
-            logger.error(f"Invalid regex pattern: {e}")
-            return
+    try:
+        compiled_pattern = _compile(pattern, flags, not regex)
+    except re.error as e:
+        logger.error(f"Invalid regex pattern: {e}")
+        return
+    
+    # Whole-file search relies on the pattern matching a line the same way inside the file
+    needle = None
+    if not regex and case_sensitive:
+        needle = pattern
+        buffer_pattern = None
+    elif regex and not _is_line_local(pattern):
+        buffer_pattern = None
     else:
-        # Escape special regex characters for literal search
-        escaped = re.escape(pattern)
-        compiled_pattern = re.compile(escaped, flags)
+        buffer_pattern = _compile(pattern, flags | re.MULTILINE, not regex)
+    
+    # hyperscan stands in for the whole-file regex on files with no match at all
+    prefilter = None
+    if buffer_pattern is not None and needle is None:
+        prefilter = _hyperscan_db(buffer_pattern.pattern, not case_sensitive)
+    
+    # Without it, a case-insensitive ASCII literal is found with str.find in
+    # lowercased ASCII text, where IGNORECASE folds no other way; other text
+    # keeps buffer_pattern
+    fold_case = prefilter is None and not regex and not case_sensitive and pattern.isascii()
+    if fold_case:
+        needle = pattern.lower()
     
     match_count = 0
+    files = _iter_search_files(search_path, excludes, include_re)
+    scan = _make_scanner(
+        compiled_pattern,
+        buffer_pattern,
+        context,
+        max_matches,
+        needle=needle,
+        prefilter=prefilter,
+        fold_case=fold_case
+    )
     
-    def iter_files(path: Path) -> Iterator[Path]:
-        """Iterate through files respecting excludes"""
-        if path.is_file():
-            yield path
-            return
-        
+    # Files are scanned in a bounded window of futures and consumed in walk
+    # order, so output matches a sequential search and the walk stops early
+    with ThreadPoolExecutor(max_workers=SEARCH_WORKERS) as executor:
+        window: Deque[Future] = deque(
+            executor.submit(scan, file_path) for file_path in islice(files, SEARCH_WORKERS * 2)
+        )
         try:
-            for item in path.iterdir():
-                if should_exclude_path(item, excludes):
-                    continue
+            while window:
+                if deadline is not None and time.monotonic() >= deadline:
+                    logger.warning("Python search timed out, returning partial matches")
+                    return
                 
-                if item.is_file():
-                    # Check includes
-                    if includes:
-                        if not any(fnmatch.fnmatch(item.name, inc) for inc in includes):
-                            continue
-                    yield item
-                elif item.is_dir():
-                    yield from iter_files(item)
-        except PermissionError:
-            pass
-    
-    for file_path in iter_files(search_path):
-        if match_count >= max_matches:
-            break
-        
-        # Skip large files
-        try:
-            if file_path.stat().st_size > MAX_SEARCH_FILE_SIZE:
-                continue
-        except OSError:
-            continue
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
-            
-            for i, line in enumerate(lines):
-                if match_count >= max_matches:
-                    break
+                file_matches = window.popleft().result()
+                
+                file_path = next(files, None)
+                if file_path is not None:
+                    window.append(executor.submit(scan, file_path))
                 
-                match = compiled_pattern.search(line)
-                if match:
-                    # Get context lines
-                    ctx_before = lines[max(0, i - context):i] if context > 0 else []
-                    ctx_after = lines[i + 1:i + 1 + context] if context > 0 else []
-                    
-                    yield SearchMatch(
-                        file=file_path,
-                        line_number=i + 1,
-                        line_content=line,
-                        match_start=match.start(),
-                        match_end=match.end(),
-                        context_before=ctx_before,
-                        context_after=ctx_after
-                    )
+                for m in file_matches:
+                    yield m
                     match_count += 1
-                    
-        except Exception as e:
-            logger.debug(f"Error searching file {file_path}: {e}")
-            continue
+                    if match_count >= max_matches:
+                        return
+        finally:
+            for future in window:
+                future.cancel()
 
 
 @tool(
@@ -321,6 +797,7 @@ def grep(
     excludes: Optional[str] = None,
     files_only: bool = False,
     count_only: bool = False,
+    timeout_ms: int = SEARCH_TIMEOUT_MS,
     workspace: Optional[Path] = None,
     permissions=None
 ) -> ToolResult:
@@ -338,6 +815,8 @@ def grep(
         excludes: Comma-separated patterns to exclude
         files_only: If True, only show file names (not line content)
         count_only: If True, only show match count per file
+        timeout_ms: Stop searching after this many milliseconds and return the
+            matches found so far (0 for no limit)
         workspace: Working directory
         permissions: Permissions engine
     
@@ -364,10 +843,41 @@ def grep(
                 status=ToolStatus.NOT_FOUND
             )
         
-        # Perform search
-        use_ripgrep = has_ripgrep() and search_path.is_dir()
+        # Perform search (invert needs every line, which only the Python walk sees)
+        use_ripgrep = has_ripgrep() and search_path.is_dir() and not invert
+        deadline = time.monotonic() + timeout_ms / 1000 if timeout_ms > 0 else None
         
-        if use_ripgrep:
+        if invert:
+            # Collect the lines that DON'T match the pattern
+            matches = []
+            flags = 0 if case_sensitive else re.IGNORECASE
+            compiled_pattern = _compile(pattern, flags, not regex)
+            include_re = _compile_includes(tuple(include_list)) if include_list else None
+            
+            for file_path in _iter_search_files(search_path, exclude_set, include_re):
+                if len(matches) >= MAX_MATCHES:
+                    break
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                
+                try:
+                    text = _read_text(file_path)
+                except OSError:
+                    continue  # Skip files that can't be read
+                if text is None:
+                    continue  # Binary file
+                
+                file = Path(file_path)
+                for line_number, line in enumerate(io.StringIO(text), start=1):
+                    if not compiled_pattern.search(line):
+                        matches.append(SearchMatch(
+                            file=file,
+                            line_number=line_number,
+                            line_content=line
+                        ))
+                        if len(matches) >= MAX_MATCHES:
+                            break
+        elif use_ripgrep:
             matches = search_with_ripgrep(
                 pattern=pattern,
                 search_path=search_path,
@@ -375,7 +885,8 @@ def grep(
                 case_sensitive=case_sensitive,
                 context=context,
                 includes=include_list,
-                excludes=list(exclude_set) if exclude_set else None
+                excludes=list(exclude_set) if exclude_set else None,
+                deadline=deadline
             )
         else:
             matches = list(search_python(
@@ -385,90 +896,18 @@ def grep(
                 case_sensitive=case_sensitive,
                 context=context,
                 includes=include_list,
-                excludes=exclude_set
+                excludes=exclude_set,
+                deadline=deadline
             ))
         
-        # Apply invert filter
-        if invert:
-            # For invert, we need to re-search and show non-matching lines
-            # This is complex with ripgrep, so we'll do Python-based for now
-            if not use_ripgrep:
-                # Create a new search that finds lines that DON'T match the pattern
-                inverted_matches = []
-
-                # Need to iterate through all files in the search path rather than just those with matches
-                def iter_files(path: Path) -> Iterator[Path]:
-                    """Iterate through files respecting excludes"""
-                    if path.is_file():
-                        yield path
-                        return
-
-                    try:
-                        for item in path.iterdir():
-                            if should_exclude_path(item, set()):
-                                continue
-
-                            if item.is_file():
-                                # Check includes
-                                if includes:
-                                    if not any(fnmatch.fnmatch(item.name, inc) for inc in includes):
-                                        continue
-                                yield item
-                            elif item.is_dir():
-                                yield from iter_files(item)
-                    except PermissionError:
-                        pass
-
-                # Rebuild the file search to cover all files
-                for file_path in iter_files(search_path):
-                    if match_count >= max_matches:
-                        break
-
-                    # Skip large files
-                    try:
-                        if file_path.stat().st_size > MAX_SEARCH_FILE_SIZE:
-                            continue
-                    except OSError:
-                        continue
-
-                    try:
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            lines = f.readlines()
-
-                        flags = 0 if case_sensitive else re.IGNORECASE
-                        if regex:
-                            try:
-                                compiled_pattern = re.compile(pattern, flags)
-                            except re.error as e:
-                                return ToolResult.fail(
-                                    error=f"Invalid regex pattern: {e}",
-                                    status=ToolStatus.VALIDATION_ERROR
-                                )
-                        else:
-                            escaped = re.escape(pattern)
-                            compiled_pattern = re.compile(escaped, flags)
-
-                        for i, line in enumerate(lines):
-                            if match_count >= max_matches:
-                                break
-                            # If line does NOT match, add it
-                            if not compiled_pattern.search(line):
-                                inverted_matches.append(SearchMatch(
-                                    file=file_path,
-                                    line_number=i + 1,
-                                    line_content=line
-                                ))
-                                match_count += 1
-                    except Exception:
-                        continue  # Skip files that can't be read
-
-                matches = inverted_matches
+        timed_out = deadline is not None and time.monotonic() >= deadline
         
         if not matches:
             return ToolResult.ok(
                 output="No matches found",
                 match_count=0,
-                search_method="ripgrep" if use_ripgrep else "python"
+                search_method="ripgrep" if use_ripgrep else "python",
+                truncated_by_timeout=timed_out
             )
         
         # Format output
@@ -487,10 +926,15 @@ def grep(
             output = '\n'.join(files)
             
         else:
-            # Full output with line numbers
+            # Full output with line numbers, stopping once past the truncation limit
             output_lines = []
+            output_size = -1
             for m in matches:
-                output_lines.append(m.format(show_context=context > 0))
+                lines = m.format_lines(show_context=context > 0)
+                output_lines.extend(lines)
+                output_size += sum(map(len, lines)) + len(lines)
+                if output_size > 50000:
+                    break
             
             output = '\n'.join(output_lines)
             
@@ -503,7 +947,8 @@ def grep(
             match_count=len(matches),
             files_matched=len(set(str(m.file) for m in matches)),
             search_method="ripgrep" if use_ripgrep else "python",
-            pattern=pattern
+            pattern=pattern,
+            truncated_by_timeout=timed_out
         )
         
     except re.error as e:
@@ -560,37 +1005,43 @@ def find(
             )
         
         results = []
-        current_depth = 0
+        # Convert max_depth to int if string
+        md = int(max_depth) if isinstance(max_depth, str) else max_depth
         
-        def search_dir(dir_path: Path, depth: int):
-            # Convert max_depth to int if string
-            md = int(max_depth) if isinstance(max_depth, str) else max_depth
-            if md is not None and depth > md:
-                return
-            
-            try:
-                for item in dir_path.iterdir():
-                    if should_exclude_path(item, set()):
-                        continue
-                    
-                    # Check if name matches pattern
-                    if fnmatch.fnmatch(item.name, pattern):
-                        # Apply type filter
-                        if type_filter == "file" and item.is_file():
-                            results.append(item)
-                        elif type_filter == "dir" and item.is_dir():
-                            results.append(item)
-                        elif type_filter == "all":
-                            results.append(item)
-                    
-                    # Recurse into directories
-                    if item.is_dir():
-                        search_dir(item, depth + 1)
-                        
-            except PermissionError:
-                pass
+        root = str(search_path)
         
-        search_dir(search_path, 0)
+        def excluded(name: str) -> bool:
+            return name in _EXCLUDE_DIR_SET or _EXCLUDE_PATTERN_RE.match(name) is not None
+        
+        # Excluded subtrees are pruned in place; symlinked directories are listed, not followed
+        for dirpath, dirnames, filenames in os.walk(root, topdown=True, followlinks=False):
+            dirnames[:] = [d for d in dirnames if not excluded(d)]
+            
+            # Apply type filter
+            if type_filter == "file":
+                names = filenames
+            elif type_filter == "dir":
+                names = dirnames
+            else:
+                names = dirnames + filenames
+            
+            for name in names:
+                if fnmatch.fnmatch(name, pattern) and not excluded(name):
+                    item = os.path.join(dirpath, name)
+                    # os.walk also reports broken links and special files as filenames
+                    if type_filter != "file" or os.path.isfile(item):
+                        results.append(item)
+                        if len(results) > MAX_MATCHES:
+                            break
+            
+            # One match past the cap is enough to know the listing is incomplete
+            if len(results) > MAX_MATCHES:
+                break
+            
+            if md is not None:
+                depth = 0 if dirpath == root else dirpath[len(root):].lstrip(os.sep).count(os.sep) + 1
+                if depth >= md:
+                    dirnames[:] = []
         
         # Format output
         if not results:
@@ -599,11 +1050,15 @@ def find(
                 count=0
             )
         
-        # Sort and format
-        results.sort()
+        truncated = len(results) > MAX_MATCHES
+        
+        # Sort by path components, the same order Path objects sort in
+        results.sort(key=lambda item: os.path.normcase(item).split(os.sep))
+        del results[MAX_MATCHES:]
         output_lines = []
         
-        for item in results[:MAX_MATCHES]:
+        for item in results:
+            item = Path(item)
             try:
                 rel_path = item.relative_to(search_path)
             except ValueError:
@@ -615,12 +1070,13 @@ def find(
         
         output = '\n'.join(output_lines)
         
-        if len(results) > MAX_MATCHES:
-            output += f"\n\n... ({len(results) - MAX_MATCHES} more matches)"
+        if truncated:
+            output += f"\n\n... (stopped after {MAX_MATCHES} matches, narrow the pattern or path to see more)"
         
         return ToolResult.ok(
             output=output,
-            count=len(results)
+            count=len(results),
+            truncated=truncated
         )
         
     except Exception as e:
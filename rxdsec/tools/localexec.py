@@ -7,21 +7,22 @@ timeout handling, and comprehensive safety features.
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
 import platform
+import re
+import selectors
 import shlex
 import shutil
-import signal
 import subprocess
-import sys
-import tempfile
-import threading
-from dataclasses import dataclass, field
+import time
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
-from .base import tool, ToolResult, ToolStatus
+from .base import tool, ToolResult, ToolStatus, _DATACLASS_SLOTS
 
 # Configure module logger
 logger = logging.getLogger(__name__)
@@ -32,8 +33,40 @@ DEFAULT_TIMEOUT = 600
 # Maximum output size (1MB)
 MAX_OUTPUT_SIZE = 1024 * 1024
 
+# Bytes requested per read from a command's output pipes
+PIPE_READ_SIZE = 64 * 1024
+
+# Seconds to keep collecting output after killing a timed-out command
+KILL_GRACE_SECONDS = 5
+
+# Environment overrides applied to every command, to avoid interactive pagers
+_PAGER_ENV = {'PAGER': 'cat', 'GIT_PAGER': 'cat'}
+
+# Host OS, looked up once rather than for every command
+_PLATFORM = platform.system()
+
+# Commands free of quotes and backslashes split exactly like shlex.split() on
+# its whitespace, without running the lexer
+_SHLEX_SYNTAX_RE = re.compile(r'[\'"\\]')
+_SHLEX_WORD_RE = re.compile(r'[^ \t\r\n]+')
+
+# cmd.exe syntax (pipes, redirection, chaining, grouping, escapes, variables)
+# and builtins, the only reasons a Windows command needs the shell
+_CMD_SYNTAX_RE = re.compile(r'[|&<>()^%]')
+_CMD_BUILTINS = frozenset({
+    'assoc', 'break', 'call', 'cd', 'chdir', 'cls', 'color', 'copy', 'date',
+    'del', 'dir', 'echo', 'endlocal', 'erase', 'for', 'ftype', 'goto', 'if',
+    'md', 'mkdir', 'mklink', 'move', 'path', 'pause', 'popd', 'prompt', 'pushd',
+    'rd', 'rem', 'ren', 'rename', 'rmdir', 'set', 'setlocal', 'shift', 'start',
+    'time', 'title', 'type', 'ver', 'verify', 'vol',
+})
+
+# Windows error for 'bash' without a WSL distribution, and the hint added to it
+_WSL_NEEDLE = "Windows Subsystem for Linux has no installed distributions"
+_WSL_HINT = "\n\n[SYSTEM HINT]: You are running on Windows and 'bash' failed because WSL is not configured. Do not try to install WSL interactively. Instead, use Windows-native commands (PowerShell) or check if there is a Windows installer (e.g. .exe/msi) or package manager (winget/choco) for the tool you are trying to use."
+
 # Dangerous commands that require explicit permission
-DANGEROUS_COMMANDS = {
+DANGEROUS_COMMANDS = frozenset({
     'rm', 'rmdir', 'del',           # Delete operations
     'mv', 'move', 'ren', 'rename',   # Move/rename (can overwrite)
     'chmod', 'chown', 'chgrp',       # Permission changes
@@ -43,10 +76,10 @@ DANGEROUS_COMMANDS = {
     'kill', 'pkill', 'killall',      # Process killing
     ':(){:|:&};:', 'fork',           # Fork bombs
     'format', 'diskpart',            # Windows disk ops
-}
+})
 
 # Safe commands that don't need confirmation
-SAFE_COMMANDS = {
+SAFE_COMMANDS = frozenset({
     # Read-only operations
     'ls', 'dir', 'cat', 'type', 'head', 'tail', 'less', 'more',
     'pwd', 'cd', 'echo', 'printf', 'date', 'time', 'whoami', 'hostname',
@@ -70,12 +103,64 @@ SAFE_COMMANDS = {
     'black', 'flake8', 'pylint', 'mypy', 'ruff',
     'eslint', 'prettier', 'tsc',
     'rustfmt', 'clippy',
+})
+
+# firejail invocation placed in front of sandboxed commands
+_FIREJAIL_PREFIX = (
+    'firejail',
+    '--noprofile',
+    '--quiet',
+    '--private-tmp',
+    '--noroot',
+    '--nosound',
+    '--no3d',
+    '--noprinters',
+    '--nodvd',
+    '--notv',
+    '--novideo',
+    '--nonewprivs',
+    '--nogroups',
+    '--net=none',  # No network by default
+)
+
+# Executable extensions dropped from Windows command names before lookup
+_WIN_EXTS = ('.exe', '.cmd', '.bat')
+
+# Project files that identify a test framework, in detection order
+_FRAMEWORK_MARKERS = (
+    ('pytest.ini', 'pytest'),
+    ('pyproject.toml', 'pytest'),
+    ('Cargo.toml', 'cargo'),
+    ('package.json', 'npm'),
+    ('go.mod', 'go'),
+    ('pom.xml', 'maven'),
+)
+
+# Test command per framework: (base command, verbose suffix, pattern suffix)
+_FRAMEWORK_CMDS = {
+    'pytest': ("python -m pytest {path}", " -v", " -k '{pattern}'"),
+    'cargo': ("cargo test", " -- --nocapture", " -- {pattern}"),
+    'npm': ("npm test", "", " -- --testNamePattern='{pattern}'"),
+    'jest': ("npm test", "", " -- --testNamePattern='{pattern}'"),
+    'go': ("go test {path}", " -v", " -run '{pattern}'"),
+    'maven': ("mvn test", "", " -Dtest='{pattern}'"),
 }
 
+# Argument patterns that make an otherwise unknown command dangerous
+DANGEROUS_PATTERNS = (
+    'rm -rf', 'rm -r', 'del /s', 'del /q',
+    '> /dev/', '| rm', '| del',
+    '; rm', '; del', '&& rm', '&& del',
+    'chmod 777', 'chmod -R',
+)
 
-@dataclass
+# All dangerous patterns as one case-insensitive alternation, scanned in a single pass
+_DANGER_RE = re.compile('|'.join(map(re.escape, DANGEROUS_PATTERNS)), re.IGNORECASE)
+
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class CommandResult:
-    """Result of command execution"""
+    """Immutable result of command execution"""
     returncode: int
     stdout: str
     stderr: str
@@ -91,16 +176,18 @@ class CommandResult:
     def output(self) -> str:
         """Combined stdout and stderr"""
         parts = []
-        if self.stdout.strip():
+        # isspace() tests for content without strip() copying up to MAX_OUTPUT_SIZE
+        if self.stdout and not self.stdout.isspace():
             parts.append(self.stdout)
-        if self.stderr.strip():
+        if self.stderr and not self.stderr.isspace():
             parts.append(f"STDERR:\n{self.stderr}")
         return '\n'.join(parts) if parts else "(no output)"
 
 
+@lru_cache(maxsize=None)
 def has_firejail() -> bool:
-    """Check if firejail is available for sandboxing (Linux only)"""
-    if platform.system() != 'Linux':
+    """Check if firejail is available for sandboxing (Linux only), searching PATH once per process"""
+    if _PLATFORM != 'Linux':
         return False
     return shutil.which('firejail') is not None
 
@@ -110,6 +197,54 @@ def has_sandbox() -> bool:
     return has_firejail()
 
 
+@lru_cache(maxsize=None)
+def _base_env() -> Dict[str, str]:
+    """Snapshot of os.environ with the pager overrides, taken at the first command"""
+    return {**os.environ, **_PAGER_ENV}
+
+
+def refresh_environment():
+    """Re-read os.environ for later commands, after the process environment changed"""
+    _base_env.cache_clear()
+
+
+def split_command(cmd: str) -> List[str]:
+    """Split a command line like shlex.split(), with a fast path for unquoted commands"""
+    if _SHLEX_SYNTAX_RE.search(cmd):
+        return shlex.split(cmd)
+    return _SHLEX_WORD_RE.findall(cmd)
+
+
+@lru_cache(maxsize=256)
+def _which(executable: str) -> Optional[str]:
+    """shutil.which, remembered per executable name"""
+    return shutil.which(executable)
+
+
+def _needs_windows_shell(cmd: str) -> bool:
+    """
+    Check whether a Windows command has to go through cmd.exe.
+    
+    Commands without shell syntax that name a real .exe are started directly
+    from their command line, saving a cmd.exe process. Builtins, batch files
+    and .cmd shims (npm, yarn) still need the shell.
+    """
+    if _CMD_SYNTAX_RE.search(cmd):
+        return True
+    try:
+        parts = shlex.split(cmd, posix=False)
+    except ValueError:
+        return True
+    if not parts:
+        return True
+    
+    executable = parts[0].strip('"')
+    if executable.lower() in _CMD_BUILTINS:
+        return True
+    resolved = _which(executable)
+    return resolved is None or not resolved.lower().endswith('.exe')
+
+
 def parse_command(cmd: str) -> Tuple[str, List[str]]:
     """
     Parse a command string into executable and arguments.
@@ -121,7 +256,7 @@ def parse_command(cmd: str) -> Tuple[str, List[str]]:
         Tuple of (executable, arguments)
     """
     try:
-        parts = shlex.split(cmd)
+        parts = split_command(cmd)
         if not parts:
             return '', []
         return parts[0], parts[1:]
@@ -147,8 +282,8 @@ def is_safe_command(cmd: str) -> bool:
     base_cmd = os.path.basename(executable).lower()
     
     # Remove extensions for Windows
-    if base_cmd.endswith('.exe') or base_cmd.endswith('.cmd') or base_cmd.endswith('.bat'):
-        base_cmd = base_cmd.rsplit('.', 1)[0]
+    if base_cmd.endswith(_WIN_EXTS):
+        base_cmd = base_cmd[:base_cmd.rindex('.')]
     
     # Check dangerous commands
     if base_cmd in DANGEROUS_COMMANDS:
@@ -159,17 +294,8 @@ def is_safe_command(cmd: str) -> bool:
         return True
     
     # Check for dangerous patterns in arguments
-    dangerous_patterns = [
-        'rm -rf', 'rm -r', 'del /s', 'del /q',
-        '> /dev/', '| rm', '| del',
-        '; rm', '; del', '&& rm', '&& del',
-        'chmod 777', 'chmod -R',
-    ]
-    
-    cmd_lower = cmd.lower()
-    for pattern in dangerous_patterns:
-        if pattern in cmd_lower:
-            return False
+    if _DANGER_RE.search(cmd):
+        return False
     
     return True  # Default to allowing (permissions engine will verify)
 
@@ -186,26 +312,103 @@ def wrap_with_sandbox(cmd: List[str], sandbox: str = "firejail") -> List[str]:
         Sandboxed command
     """
     if sandbox == "firejail" and has_firejail():
-        return [
-            'firejail',
-            '--noprofile',
-            '--quiet',
-            '--private-tmp',
-            '--noroot',
-            '--nosound',
-            '--no3d',
-            '--noprinters',
-            '--nodvd',
-            '--notv',
-            '--novideo',
-            '--nonewprivs',
-            '--nogroups',
-            '--net=none',  # No network by default
-        ] + cmd
+        return [*_FIREJAIL_PREFIX, *cmd]
     
     return cmd
 
 
+def _communicate(process: subprocess.Popen, timeout: float) -> Tuple[bytes, bytes, bool]:
+    """
+    Wait for a process and collect its raw output.
+    
+    On POSIX the pipes are drained with os.read through a selector, which
+    avoids the reader threads and incremental text decoding of
+    Popen.communicate(). Past MAX_OUTPUT_SIZE bytes a stream is still read,
+    so the process never blocks on a full pipe, but the rest is discarded.
+    A process still running at the timeout is killed, and whatever it wrote
+    is kept.
+    
+    Args:
+        process: Process started with stdout/stderr as pipes, or not captured
+        timeout: Timeout in seconds
+    
+    Returns:
+        Tuple of (stdout, stderr, timed_out); output longer than
+        MAX_OUTPUT_SIZE keeps one extra byte to show it was cut
+    """
+    if _PLATFORM == 'Windows':
+        # select() only works on sockets there, so let communicate() use its threads
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+            return stdout or b'', stderr or b'', False
+        except subprocess.TimeoutExpired:
+            process.kill()
+            try:
+                stdout, stderr = process.communicate(timeout=KILL_GRACE_SECONDS)
+            except Exception:
+                stdout, stderr = b'', b''
+            return stdout or b'', stderr or b'', True
+    
+    pipes = (process.stdout, process.stderr)
+    buffers = [bytearray(), bytearray()]
+    deadline = time.monotonic() + timeout
+    timed_out = False
+    
+    with selectors.DefaultSelector() as selector:
+        for pipe, buffer in zip(pipes, buffers):
+            if pipe is not None:
+                selector.register(pipe.fileno(), selectors.EVENT_READ, buffer)
+        
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                if timed_out:
+                    break
+                timed_out = True
+                process.kill()
+                deadline = time.monotonic() + KILL_GRACE_SECONDS
+                continue
+            
+            for key, _ in selector.select(remaining):
+                chunk = os.read(key.fd, PIPE_READ_SIZE)
+                if not chunk:
+                    selector.unregister(key.fd)
+                elif len(key.data) <= MAX_OUTPUT_SIZE:
+                    key.data.extend(chunk[:MAX_OUTPUT_SIZE + 1 - len(key.data)])
+    
+    # The pipes can close before the process exits
+    try:
+        process.wait(timeout=max(deadline - time.monotonic(), 0))
+    except subprocess.TimeoutExpired:
+        if not timed_out:
+            timed_out = True
+            process.kill()
+            process.wait()
+    
+    for pipe in pipes:
+        if pipe is not None:
+            pipe.close()
+    
+    return bytes(buffers[0]), bytes(buffers[1]), timed_out
+
+
+def _decode_output(data: bytes) -> str:
+    """Decode command output once, translating newlines as text mode did and truncating it"""
+    if not data:
+        return ''
+    text = data[:MAX_OUTPUT_SIZE].decode('utf-8', errors='replace').replace('\r\n', '\n').replace('\r', '\n')
+    if len(data) > MAX_OUTPUT_SIZE:
+        text += "\n... (output truncated)"
+    return text
+
+
+def _add_wsl_hint(stderr: str) -> str:
+    """Point the agent at Windows-native tools when 'bash' fails for lack of a WSL distribution"""
+    if _PLATFORM == 'Windows' and _WSL_NEEDLE in stderr:
+        return stderr + _WSL_HINT
+    return stderr
+
+
 def run_command(
     cmd: str,
     cwd: Optional[Path] = None,
@@ -228,34 +431,32 @@ def run_command(
     Returns:
         CommandResult with execution outcome
     """
-    import time
-    start_time = time.time()
+    start_time = time.monotonic()
     
     try:
         # Parse command
-        if platform.system() == 'Windows':
-            # Windows: Use shell for complex commands
+        if _PLATFORM == 'Windows':
+            # Windows: CreateProcess takes the command line as is, so only
+            # shell syntax and builtins need cmd.exe
             cmd_list = cmd
-            use_shell = True
+            use_shell = _needs_windows_shell(cmd)
         else:
             # Unix: Parse into list
-            cmd_list = shlex.split(cmd)
+            cmd_list = split_command(cmd)
             use_shell = False
             
             # Apply sandbox if requested
             if sandbox:
                 cmd_list = wrap_with_sandbox(cmd_list)
         
-        # Prepare environment
-        run_env = os.environ.copy()
+        # Prepare environment; the shared snapshot is only ever copied, never modified
+        run_env = _base_env()
         if env:
-            run_env.update(env)
-        
-        # Set PAGER to cat to avoid interactive pagers
-        run_env['PAGER'] = 'cat'
-        run_env['GIT_PAGER'] = 'cat'
+            run_env = {**run_env, **env, **_PAGER_ENV}
         
-        # Run command
+        # Run command; output is read from the raw pipes, so they get no Python buffer.
+        # Without preexec_fn, user/group or umask changes CPython starts the child
+        # with vfork; close_fds stays on so agent commands inherit no descriptors
         process = subprocess.Popen(
             cmd_list,
             stdout=subprocess.PIPE if capture_output else None,
@@ -263,56 +464,139 @@ def run_command(
             cwd=str(cwd) if cwd else None,
             env=run_env,
             shell=use_shell,
-            text=True
+            bufsize=0
+        )
+        
+        stdout, stderr, timed_out = _communicate(process, timeout)
+        
+        # A timed-out process was killed, but keeps the output it wrote
+        return CommandResult(
+            returncode=-1 if timed_out else process.returncode,
+            stdout=_decode_output(stdout),
+            stderr=_add_wsl_hint(_decode_output(stderr)),
+            timed_out=timed_out,
+            killed=timed_out,
+            duration_seconds=time.monotonic() - start_time
+        )
+        
+    except FileNotFoundError:
+        return CommandResult(
+            returncode=127,
+            stdout='',
+            stderr=f"Command not found: {parse_command(cmd)[0]}",
+            timed_out=False,
+            killed=False,
+            duration_seconds=time.monotonic() - start_time
+        )
+    except Exception as e:
+        return CommandResult(
+            returncode=-1,
+            stdout='',
+            stderr=str(e),
+            timed_out=False,
+            killed=False,
+            duration_seconds=time.monotonic() - start_time
+        )
+
+
+async def _read_capped(stream: asyncio.StreamReader, buffer: bytearray) -> None:
+    """Drain a stream into buffer, keeping at most MAX_OUTPUT_SIZE + 1 bytes"""
+    while True:
+        chunk = await stream.read(PIPE_READ_SIZE)
+        if not chunk:
+            return
+        if len(buffer) <= MAX_OUTPUT_SIZE:
+            buffer.extend(chunk[:MAX_OUTPUT_SIZE + 1 - len(buffer)])
+
+
+async def run_command_async(
+    cmd: str,
+    cwd: Optional[Path] = None,
+    env: Optional[Dict[str, str]] = None,
+    timeout: int = DEFAULT_TIMEOUT,
+    sandbox: bool = False,
+    capture_output: bool = True
+) -> CommandResult:
+    """
+    Run a command without blocking the event loop.
+    
+    Same contract as run_command(), for agents that run many commands
+    concurrently. On POSIX the event loop's child watcher reports the exit,
+    so nothing polls for it; on Windows run_command() runs in a worker thread.
+    
+    Args:
+        cmd: Command to run
+        cwd: Working directory
+        env: Environment variables
+        timeout: Timeout in seconds
+        sandbox: Whether to use sandboxing
+        capture_output: Whether to capture stdout/stderr
+    
+    Returns:
+        CommandResult with execution outcome
+    """
+    loop = asyncio.get_running_loop()
+    
+    if _PLATFORM == 'Windows':
+        # The asyncio transports re-quote the command line, which run_command() passes as is
+        return await loop.run_in_executor(
+            None, run_command, cmd, cwd, env, timeout, sandbox, capture_output
+        )
+    
+    start_time = time.monotonic()
+    
+    try:
+        cmd_list = split_command(cmd)
+        if sandbox:
+            cmd_list = wrap_with_sandbox(cmd_list)
+        
+        run_env = _base_env()
+        if env:
+            run_env = {**run_env, **env, **_PAGER_ENV}
+        
+        pipe = asyncio.subprocess.PIPE if capture_output else None
+        process = await asyncio.create_subprocess_exec(
+            *cmd_list,
+            stdout=pipe,
+            stderr=pipe,
+            cwd=str(cwd) if cwd else None,
+            env=run_env
         )
         
+        # Readers fill the buffers in place, so a timeout keeps the partial output
+        buffers = (bytearray(), bytearray())
+        pending = {
+            asyncio.ensure_future(_read_capped(stream, buffer))
+            for stream, buffer in zip((process.stdout, process.stderr), buffers)
+            if stream is not None
+        }
+        pending.add(asyncio.ensure_future(process.wait()))
+        timed_out = False
         try:
-            stdout, stderr = process.communicate(timeout=timeout)
-            
-            # Truncate output if too long
-            if stdout and len(stdout) > MAX_OUTPUT_SIZE:
-                stdout = stdout[:MAX_OUTPUT_SIZE] + "\n... (output truncated)"
-            if stderr and len(stderr) > MAX_OUTPUT_SIZE:
-                stderr = stderr[:MAX_OUTPUT_SIZE] + "\n... (output truncated)"
-            
-            duration = time.time() - start_time
-            
-            # Check for common Windows/WSL errors to hint the agent
-            if platform.system() == 'Windows' and stderr and "Windows Subsystem for Linux has no installed distributions" in stderr:
-                stderr += "\n\n[SYSTEM HINT]: You are running on Windows and 'bash' failed because WSL is not configured. Do not try to install WSL interactively. Instead, use Windows-native commands (PowerShell) or check if there is a Windows installer (e.g. .exe/msi) or package manager (winget/choco) for the tool you are trying to use."
-            
-            return CommandResult(
-                returncode=process.returncode,
-                stdout=stdout or '',
-                stderr=stderr or '',
-                timed_out=False,
-                killed=False,
-                duration_seconds=duration
-            )
-            
-        except subprocess.TimeoutExpired:
-            # Kill process on timeout
-            process.kill()
-            try:
-                stdout, stderr = process.communicate(timeout=5)
-            except:
-                stdout, stderr = '', ''
-            
-            duration = time.time() - start_time
-            
-            # Check for common Windows/WSL errors to hint the agent
-            if platform.system() == 'Windows' and "Windows Subsystem for Linux has no installed distributions" in stderr:
-                stderr += "\n\n[SYSTEM HINT]: You are running on Windows and 'bash' failed because WSL is not configured. Do not try to install WSL interactively. Instead, use Windows-native commands (PowerShell) or check if there is a Windows installer (e.g. .exe/msi) or package manager (winget/choco) for the tool you are trying to use."
-
-            return CommandResult(
-                returncode=-1,
-                stdout=stdout or '',
-                stderr=stderr or '',
-                timed_out=True,
-                killed=True,
-                duration_seconds=duration
-            )
-            
+            _, pending = await asyncio.wait(pending, timeout=timeout)
+            if pending:
+                timed_out = True
+                process.kill()
+                # Readers keep draining through the grace period, as in _communicate()
+                _, pending = await asyncio.wait(pending, timeout=KILL_GRACE_SECONDS)
+        finally:
+            if pending:
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                # A background child can hold the pipes open; closing the transport
+                # closes them (and kills the process if it still runs) while the loop is alive
+                process._transport.close()
+        
+        return CommandResult(
+            returncode=-1 if timed_out else process.returncode,
+            stdout=_decode_output(bytes(buffers[0])),
+            stderr=_decode_output(bytes(buffers[1])),
+            timed_out=timed_out,
+            killed=timed_out,
+            duration_seconds=time.monotonic() - start_time
+        )
+        
     except FileNotFoundError:
         return CommandResult(
             returncode=127,
@@ -320,7 +604,7 @@ def run_command(
             stderr=f"Command not found: {parse_command(cmd)[0]}",
             timed_out=False,
             killed=False,
-            duration_seconds=time.time() - start_time
+            duration_seconds=time.monotonic() - start_time
         )
     except Exception as e:
         return CommandResult(
@@ -329,7 +613,7 @@ def run_command(
             stderr=str(e),
             timed_out=False,
             killed=False,
-            duration_seconds=time.time() - start_time
+            duration_seconds=time.monotonic() - start_time
         )
 
 
@@ -381,28 +665,26 @@ def localexec(
             logger.warning(f"Potentially dangerous command: {cmd}")
             # We still allow it - permissions engine will handle blocking
         
-        # Resolve working directory
+        # Resolve working directory; only a user-supplied cwd is checked up front
         if cwd:
             work_dir = Path(cwd).resolve()
+            if not work_dir.exists():
+                return ToolResult.fail(
+                    error=f"Working directory not found: {work_dir}",
+                    status=ToolStatus.NOT_FOUND
+                )
         elif workspace:
             work_dir = workspace
         else:
             work_dir = Path.cwd()
         
-        if not work_dir.exists():
-            return ToolResult.fail(
-                error=f"Working directory not found: {work_dir}",
-                status=ToolStatus.NOT_FOUND
-            )
-        
         # Parse environment variables
         env_dict = None
         if env:
-            env_dict = {}
-            for pair in env.split(','):
-                if '=' in pair:
-                    key, value = pair.split('=', 1)
-                    env_dict[key.strip()] = value.strip()
+            env_dict = {
+                key.strip(): value.strip()
+                for key, value in (pair.split('=', 1) for pair in env.split(',') if '=' in pair)
+            }
         
         # Execute command
         result = run_command(
@@ -413,25 +695,33 @@ def localexec(
             sandbox=sandbox
         )
         
+        # A vanished workspace surfaces as a failed exec; report it as before
+        if result.returncode == 127 and not work_dir.exists():
+            return ToolResult.fail(
+                error=f"Working directory not found: {work_dir}",
+                status=ToolStatus.NOT_FOUND
+            )
+        
         # Build result
+        output = result.output
         if result.timed_out:
             return ToolResult.fail(
                 error=f"Command timed out after {timeout} seconds",
-                output=result.output,
+                output=output,
                 status=ToolStatus.TIMEOUT,
                 duration_ms=result.duration_seconds * 1000
             )
         
         if result.success:
             return ToolResult.ok(
-                output=result.output,
+                output=output,
                 returncode=result.returncode,
                 duration_seconds=result.duration_seconds
             )
         else:
             return ToolResult.fail(
                 error=f"Command failed with exit code {result.returncode}",
-                output=result.output,
+                output=output,
                 status=ToolStatus.FAILURE,
                 returncode=result.returncode,
                 duration_ms=result.duration_seconds * 1000
@@ -505,58 +795,32 @@ def run_tests(
     
     # Auto-detect framework if not specified
     if not framework:
-        if (work_dir / "pytest.ini").exists() or (work_dir / "pyproject.toml").exists():
-            framework = "pytest"
-        elif (work_dir / "Cargo.toml").exists():
-            framework = "cargo"
-        elif (work_dir / "package.json").exists():
-            framework = "npm"
-        elif (work_dir / "go.mod").exists():
-            framework = "go"
-        elif (work_dir / "pom.xml").exists():
-            framework = "maven"
-        else:
-            # Default to pytest for Python projects
-            framework = "pytest"
+        # One directory listing instead of a stat() per marker file
+        try:
+            with os.scandir(work_dir) as it:
+                entries = {entry.name for entry in it}
+        except OSError:
+            entries = set()
+        framework = next(
+            (name for marker, name in _FRAMEWORK_MARKERS if marker in entries),
+            "pytest"  # Default to pytest for Python projects
+        )
     
     # Build command based on framework
-    if framework == "pytest":
-        cmd = f"python -m pytest {path}"
-        if verbose:
-            cmd += " -v"
-        if pattern:
-            cmd += f" -k '{pattern}'"
-    
-    elif framework == "cargo":
-        cmd = f"cargo test"
-        if pattern:
-            cmd += f" -- {pattern}"
-        if verbose:
-            cmd += " -- --nocapture"
-    
-    elif framework == "npm" or framework == "jest":
-        cmd = "npm test"
-        if pattern:
-            cmd += f" -- --testNamePattern='{pattern}'"
-    
-    elif framework == "go":
-        cmd = f"go test {path}"
-        if verbose:
-            cmd += " -v"
-        if pattern:
-            cmd += f" -run '{pattern}'"
-    
-    elif framework == "maven":
-        cmd = "mvn test"
-        if pattern:
-            cmd += f" -Dtest='{pattern}'"
-    
-    else:
+    template = _FRAMEWORK_CMDS.get(framework)
+    if template is None:
         return ToolResult.fail(
             error=f"Unknown test framework: {framework}",
             status=ToolStatus.VALIDATION_ERROR
         )
     
+    base, verbose_flag, pattern_flag = template
+    cmd = base.format(path=path)
+    if pattern:
+        cmd += pattern_flag.format(pattern=pattern)
+    if verbose:
+        cmd += verbose_flag
+    
     return localexec(
         cmd=cmd,
         timeout=300,  # 5 minute timeout for tests
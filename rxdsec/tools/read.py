@@ -7,13 +7,24 @@ binary file handling, and comprehensive error handling.
 
 from __future__ import annotations
 
+import codecs
+import io
 import logging
-import mimetypes
 import os
+import stat
+import threading
+from itertools import islice
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
-from .base import tool, ToolResult, ToolStatus
+from .base import tool, ToolResult, ToolStatus, _resolved_workspace
+
+# Optional: chardetng for legacy (non-UTF-8) encodings
+try:
+    import chardetng_py
+    HAS_CHARDETNG = True
+except ImportError:
+    HAS_CHARDETNG = False
 
 # Configure module logger
 logger = logging.getLogger(__name__)
@@ -27,6 +38,42 @@ MAX_OUTPUT_LENGTH = 4 * 1024
 # Maximum default lines to read (reduced from 200 to improve performance)
 MAX_DEFAULT_LINES = 100
 
+# Bytes from the start of a file used to detect its encoding (one text-mode read chunk)
+ENCODING_SNIFF_SIZE = 8192
+
+# Reads past a file's reported size (procfs, growing files) go in chunks of this size
+READ_CHUNK_SIZE = 64 * 1024
+
+# os.open flags for reading file content (O_BINARY only exists on Windows)
+_READ_FLAGS = os.O_RDONLY | getattr(os, 'O_BINARY', 0)
+
+# Skips the atime update; Linux only, and only allowed for the file owner
+_O_NOATIME = getattr(os, 'O_NOATIME', 0)
+
+# posix_fadvise() is missing on Windows and macOS
+HAS_FADVISE = hasattr(os, 'posix_fadvise')
+
+# Files whose detected encoding is remembered, keyed by (path, mtime_ns, size)
+ENCODING_CACHE_SIZE = 256
+_ENCODING_CACHE: Dict[Tuple[str, int, int], str] = {}
+_ENCODING_CACHE_LOCK = threading.Lock()
+
+# Byte order marks and the codec that decodes (and drops) them
+_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# Bytes from the start of a file checked for null bytes
+BINARY_SNIFF_SIZE = 8192
+
+# Longest byte sequence for one character in the LF-safe encodings
+_MAX_CHAR_BYTES = 4
+
+# Encodings (codecs names) whose LF byte is not always a line break
+_STATEFUL_ENCODINGS = frozenset({'utf-16', 'iso2022_jp'})
+
 # Common text file extensions
 TEXT_EXTENSIONS = {
     '.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.c', '.cpp', '.h', '.hpp',
@@ -50,59 +97,164 @@ BINARY_EXTENSIONS = {
     '.woff', '.woff2', '.ttf', '.otf', '.eot'
 }
 
+# Extension -> whether it marks a binary file; binary wins for extensions in both sets
+_BINARY_BY_EXTENSION = {
+    **dict.fromkeys(TEXT_EXTENSIONS, False),
+    **dict.fromkeys(BINARY_EXTENSIONS, True),
+}
 
-def detect_encoding(file_path: Path) -> str:
+
+def _sniff_encoding(head: bytes, final: bool = False) -> str:
     """
-    Detect the encoding of a file.
+    Detect the encoding of a file from its first bytes.
+    
+    A BOM decides outright, and ASCII or valid UTF-8 needs no detector.
+    Anything else goes to chardetng when installed, else latin-1, which
+    decodes any byte.
     
     Args:
-        file_path: Path to the file
+        head: Leading bytes of the file
+        final: Whether head is the whole file
     
     Returns:
         Detected encoding string
     """
-    encodings_to_try = ['utf-8', 'utf-8-sig', 'latin-1', 'cp1252', 'iso-8859-1']
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    
+    if head.isascii():
+        return 'utf-8'
+    
+    try:
+        # Unless head is the whole file, it may end inside a multi-byte character
+        codecs.getincrementaldecoder('utf-8')().decode(head, final)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
     
-    for encoding in encodings_to_try:
+    if HAS_CHARDETNG:
+        encoding = chardetng_py.detect(head)
         try:
-            with open(file_path, 'r', encoding=encoding) as f:
-                f.read(1024)  # Read first 1KB to test
+            codecs.lookup(encoding)
             return encoding
-        except (UnicodeDecodeError, UnicodeError):
-            continue
+        except LookupError:
+            logger.debug(f"No codec for detected encoding {encoding}")
+    
+    return 'latin-1'
+
+
+def _cached_encoding(key: Tuple[str, int, int], raw: bytes) -> str:
+    """
+    Encoding of a file version, sniffed from raw on first sight.
+    
+    Args:
+        key: (path, st_mtime_ns, st_size) of the file
+        raw: File content
+    
+    Returns:
+        Detected encoding string
+    """
+    encoding = _ENCODING_CACHE.get(key)
+    if encoding is None:
+        encoding = _sniff_encoding(raw[:ENCODING_SNIFF_SIZE], len(raw) <= ENCODING_SNIFF_SIZE)
+        # Reads may run on several threads; eviction iterates the dict
+        with _ENCODING_CACHE_LOCK:
+            if len(_ENCODING_CACHE) >= ENCODING_CACHE_SIZE:
+                # Drop the oldest entry
+                _ENCODING_CACHE.pop(next(iter(_ENCODING_CACHE)), None)
+            _ENCODING_CACHE[key] = encoding
+    return encoding
+
+
+def _read_bytes(file_path: Path, file_stat: os.stat_result, limit: int) -> bytes:
+    """
+    Read up to limit bytes of a file with unbuffered os.read calls.
+    
+    The size from stat() sizes the first read, so small files don't get a
+    limit-sized buffer, and a short read ends it. Files reporting the wrong
+    size (procfs, or growing ones) are read on in chunks. On Linux the read
+    skips the atime update when allowed (file owner) and tells the kernel
+    the access is sequential.
+    
+    Args:
+        file_path: Path to the file
+        file_stat: stat() result for the file
+        limit: Maximum bytes to read
+    
+    Returns:
+        The bytes read
+    """
+    flags = _READ_FLAGS
+    if _O_NOATIME and file_stat.st_uid == os.geteuid():
+        flags |= _O_NOATIME
+    
+    fd = os.open(file_path, flags)
+    try:
+        if HAS_FADVISE:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        
+        chunks = []
+        remaining = limit
+        # One byte past the expected size shows the end in a single call
+        want = file_stat.st_size + 1
+        while remaining > 0:
+            chunk = os.read(fd, min(want, remaining))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+            if len(chunk) < want:
+                break
+            want = READ_CHUNK_SIZE
+        return b''.join(chunks)
+    finally:
+        os.close(fd)
+
+
+def detect_encoding(file_path: Path) -> str:
+    """
+    Detect the encoding of a file.
+    
+    Args:
+        file_path: Path to the file
+    
+    Returns:
+        Detected encoding string
+    """
+    fd = os.open(file_path, _READ_FLAGS)
+    try:
+        # One byte more shows whether the head is the whole file
+        head = os.read(fd, ENCODING_SNIFF_SIZE + 1)
+    finally:
+        os.close(fd)
     
-    return 'utf-8'  # Default fallback
+    return _sniff_encoding(head[:ENCODING_SNIFF_SIZE], len(head) <= ENCODING_SNIFF_SIZE)
 
 
-def is_binary_file(file_path: Path) -> bool:
+def is_binary_file(file_path: Path, head: Optional[bytes] = None) -> bool:
     """
     Check if a file is binary.
     
     Args:
         file_path: Path to the file
+        head: First bytes of the file, if already read
     
     Returns:
         True if the file appears to be binary
     """
     # Check extension first
-    if file_path.suffix.lower() in BINARY_EXTENSIONS:
-        return True
+    binary = _BINARY_BY_EXTENSION.get(file_path.suffix.lower())
+    if binary is not None:
+        return binary
     
-    if file_path.suffix.lower() in TEXT_EXTENSIONS:
-        return False
+    # Unclassified extension: check file content for null bytes
+    if head is not None:
+        return b'\x00' in head[:BINARY_SNIFF_SIZE]
     
-    # Check MIME type
-    mime_type, _ = mimetypes.guess_type(str(file_path))
-    if mime_type:
-        if mime_type.startswith('text/'):
-            return False
-        if mime_type in ('application/json', 'application/xml', 'application/javascript'):
-            return False
-    
-    # Check file content for null bytes
     try:
         with open(file_path, 'rb') as f:
-            chunk = f.read(8192)
+            chunk = f.read(BINARY_SNIFF_SIZE)
             if b'\x00' in chunk:
                 return True
     except Exception:
@@ -111,6 +263,104 @@ def is_binary_file(file_path: Path) -> bool:
     return False
 
 
+def _count_lines(raw: bytes, encoding: str) -> int:
+    """
+    Count lines the way text-mode reading splits them (\\n, \\r\\n or \\r).
+    
+    Args:
+        raw: File content
+        encoding: Encoding of the content
+    
+    Returns:
+        Number of lines, including a last line without a line break
+    """
+    if encoding.startswith('utf-16'):
+        # Newline bytes can't be counted in the encoded form
+        data = raw.decode(encoding, errors='replace')
+        lf, cr = '\n', '\r'
+    else:
+        data = raw
+        lf, cr = b'\n', b'\r'
+    
+    count = data.count(lf)
+    if cr in data:
+        count += data.count(cr) - data.count(cr + lf)
+    if data and not data.endswith((lf, cr)):
+        count += 1
+    return count
+
+
+def _take_lines(
+    f: io.TextIOWrapper,
+    skip: int = 0,
+    count: Optional[int] = None,
+    limit: int = MAX_OUTPUT_LENGTH
+) -> List[str]:
+    """
+    Read lines until they hold more than limit characters.
+    
+    Output is cut at limit characters anyway, so later lines are never
+    decoded or kept. Both the skipping and readlines(limit), which stops
+    once the lines read exceed limit, run in C.
+    
+    Args:
+        f: Text stream to read
+        skip: Lines to skip first
+        count: Maximum lines to return (None for no maximum)
+        limit: Characters after which to stop
+    
+    Returns:
+        The lines, ending with the one that crossed limit if any did
+    """
+    if skip:
+        next(islice(f, skip, skip), None)
+    return f.readlines(limit)[:count]
+
+
+def _read_tail(raw: bytes, encoding: str, count: int, limit: Optional[int] = None) -> str:
+    """
+    Decode the last lines of a file.
+    
+    The start of the tail is found by searching back for LF bytes, so only
+    the tail is decoded. Content with CR line breaks, or in an encoding
+    where an LF byte may not be a line break, is decoded whole instead.
+    
+    Args:
+        raw: File content
+        encoding: Encoding of the content
+        count: Number of lines to return
+        limit: Characters needed; only enough bytes for limit + 1 are decoded
+    
+    Returns:
+        The last count lines, with newlines translated as in text mode
+    """
+    if b'\r' in raw or codecs.lookup(encoding).name in _STATEFUL_ENCODINGS:
+        with _open_text(raw, encoding) as f:
+            all_lines = f.readlines()
+        return ''.join(all_lines[len(all_lines) - count:]) if count else ''
+    
+    pos = len(raw)
+    if raw.endswith(b'\n'):
+        pos -= 1
+    for _ in range(count):
+        pos = raw.rfind(b'\n', 0, pos)
+        if pos < 0:
+            break
+    
+    if not count:
+        return ''
+    end = None
+    if limit is not None:
+        # limit + 1 whole characters, plus a character the cut may split
+        end = pos + 1 + (limit + 2) * _MAX_CHAR_BYTES
+    return raw[pos + 1:end].decode(encoding, errors='replace')
+
+
+def _open_text(raw: bytes, encoding: str) -> io.TextIOWrapper:
+    """Text stream over content already in memory, decoded as open(..., 'r') would"""
+    return io.TextIOWrapper(io.BytesIO(raw), encoding=encoding, errors='replace')
+
+
 def parse_line_range(lines_spec: str) -> Tuple[Optional[int], Optional[int]]:
     """
     Parse a line range specification.
@@ -123,36 +373,33 @@ def parse_line_range(lines_spec: str) -> Tuple[Optional[int], Optional[int]]:
     - "-10" -> last 10 lines (negative indexing)
     
     Args:
-        lines_spec: Line range specification string
+        lines_spec: Line range specification string (a bare int is accepted)
     
     Returns:
-        Tuple of (start_line, end_line) where None means "default"
+        Tuple of (start_line, end_line) where None means "default"; a spec
+        that matches none of the formats is treated as no spec
     """
-    lines_spec = lines_spec.strip()
+    lines_spec = str(lines_spec).strip()
     
-    if not lines_spec:
-        return None, None
+    # Single number means first N lines
+    if lines_spec.isdecimal():
+        return 1, int(lines_spec)
     
     # Handle negative indexing (last N lines)
-    if lines_spec.startswith('-') and lines_spec[1:].isdigit():
-        return -int(lines_spec[1:]), None
+    if lines_spec.startswith('-'):
+        if lines_spec[1:].isdecimal():
+            return -int(lines_spec[1:]), None
+        separator = ':'
+    else:
+        separator = '-' if '-' in lines_spec else ':'
     
     # Handle range formats
-    if '-' in lines_spec and not lines_spec.startswith('-'):
-        parts = lines_spec.split('-', 1)
-        start = int(parts[0]) if parts[0] else 1
-        end = int(parts[1]) if parts[1] else None
-        return start, end
-    
-    if ':' in lines_spec:
-        parts = lines_spec.split(':', 1)
-        start = int(parts[0]) if parts[0] else 1
-        end = int(parts[1]) if parts[1] else None
-        return start, end
-    
-    # Single number means first N lines
-    if lines_spec.isdigit():
-        return 1, int(lines_spec)
+    start, found, end = lines_spec.partition(separator)
+    if found:
+        try:
+            return int(start) if start else 1, int(end) if end else None
+        except ValueError:
+            pass
     
     return None, None
 
@@ -172,12 +419,9 @@ def format_line_numbers(content: str, start_line: int = 1) -> str:
     max_line_num = start_line + len(lines) - 1
     width = len(str(max_line_num))
     
-    numbered_lines = []
-    for i, line in enumerate(lines):
-        line_num = start_line + i
-        numbered_lines.append(f"{line_num:>{width}} | {line}")
-    
-    return '\n'.join(numbered_lines)
+    # One format string for all lines; map() applies it to (number, line) pairs in C
+    line_format = f"%{width}d | %s"
+    return '\n'.join(map(line_format.__mod__, enumerate(lines, start_line)))
 
 
 @tool(
@@ -215,38 +459,45 @@ def read(
         # Security check: ensure path is within workspace
         if workspace:
             try:
-                full_path.relative_to(workspace.resolve())
+                full_path.relative_to(_resolved_workspace(workspace))
             except ValueError:
-                # Path is outside workspace - check if it's a safe absolute path
-                if not full_path.exists():
-                    return ToolResult.fail(
-                        error=f"File not found: {path}",
-                        status=ToolStatus.NOT_FOUND
-                    )
+                # Path is outside workspace - allowed as an absolute path if it exists
+                logger.debug(f"Reading file outside workspace: {full_path}")
         
-        # Check if file exists
-        if not full_path.exists():
+        # Check if file exists; one stat() serves the existence, type and size checks
+        try:
+            file_stat = os.stat(full_path)
+        except (FileNotFoundError, NotADirectoryError):
             return ToolResult.fail(
                 error=f"File not found: {path}",
                 status=ToolStatus.NOT_FOUND
             )
         
-        if not full_path.is_file():
+        if not stat.S_ISREG(file_stat.st_mode):
             return ToolResult.fail(
                 error=f"Not a file: {path}",
                 status=ToolStatus.VALIDATION_ERROR
             )
         
         # Check file size
-        file_size = full_path.stat().st_size
+        file_size = file_stat.st_size
         if file_size > MAX_FILE_SIZE:
             return ToolResult.fail(
                 error=f"File too large ({file_size / 1024 / 1024:.2f}MB). Maximum is {MAX_FILE_SIZE / 1024 / 1024:.0f}MB.",
                 status=ToolStatus.VALIDATION_ERROR
             )
 
+        # Read the file once; the binary check, encoding detection and
+        # line selection below all work on this copy
+        raw = _read_bytes(full_path, file_stat, MAX_FILE_SIZE + 1)
+        if len(raw) > MAX_FILE_SIZE:
+            return ToolResult.fail(
+                error=f"File too large ({len(raw) / 1024 / 1024:.2f}MB). Maximum is {MAX_FILE_SIZE / 1024 / 1024:.0f}MB.",
+                status=ToolStatus.VALIDATION_ERROR
+            )
+        
         # Check if binary
-        if is_binary_file(full_path):
+        if is_binary_file(full_path, raw):
             return ToolResult.fail(
                 error=f"Cannot read binary file: {path}. Detected as binary based on extension or content.",
                 status=ToolStatus.VALIDATION_ERROR,
@@ -254,9 +505,10 @@ def read(
             )
 
         # Detect encoding
-        encoding = detect_encoding(full_path)
+        encoding = _cached_encoding((str(full_path), file_stat.st_mtime_ns, file_size), raw)
+        total_lines = _count_lines(raw, encoding)
 
-        # Apply line range before reading entire file to save memory
+        # Apply line range; the text is only decoded as far as it is read
         start_line = 1
         end_line = None
 
@@ -264,32 +516,26 @@ def read(
             start, end = parse_line_range(lines)
             if start is not None:
                 if start < 0:
-                    # For negative indexing (last N lines), we need to read the whole file first
+                    # For negative indexing (last N lines), only the tail is decoded
+                    start_line = max(1, total_lines + start + 1)
+                    lines_shown = total_lines - start_line + 1
                     try:
-                        with open(full_path, 'r', encoding=encoding, errors='replace') as f:
-                            all_lines = f.readlines()
+                        content = _read_tail(raw, encoding, lines_shown, MAX_OUTPUT_LENGTH)
                     except Exception as e:
                         return ToolResult.fail(
                             error=f"Failed to read file: {str(e)}",
                             status=ToolStatus.FAILURE
                         )
-                    total_lines = len(all_lines)
-                    start_line = max(1, total_lines + start + 1)
-                    all_lines = all_lines[start_line - 1:]
-                    content = ''.join(all_lines)
                 else:
                     # For specific line ranges, use more memory-efficient approach
                     start_line = max(1, start)
-                    end_line = end
+                    end_line = max(end, 0) if end else None
                     try:
-                        with open(full_path, 'r', encoding=encoding, errors='replace') as f:
-                            all_lines = []
-                            for i, line in enumerate(f, 1):
-                                if end_line and i > end_line:
-                                    break
-                                if i >= start_line:
-                                    all_lines.append(line)
+                        with _open_text(raw, encoding) as f:
+                            count = None if end_line is None else max(end_line - start_line + 1, 0)
+                            all_lines = _take_lines(f, start_line - 1, count)
                         content = ''.join(all_lines)
+                        lines_shown = len(all_lines)
                     except Exception as e:
                         return ToolResult.fail(
                             error=f"Failed to read file: {str(e)}",
@@ -298,14 +544,12 @@ def read(
             else:
                 # No range specified, read with line limits
                 try:
-                    with open(full_path, 'r', encoding=encoding, errors='replace') as f:
-                        all_lines = []
-                        for i, line in enumerate(f, 1):
-                            if i > MAX_DEFAULT_LINES:
-                                all_lines.append(f"\n\n... (File has more than {MAX_DEFAULT_LINES} lines. Use read(path, lines='{MAX_DEFAULT_LINES + 1}:') to read more)")
-                                break
-                            all_lines.append(line)
+                    with _open_text(raw, encoding) as f:
+                        all_lines = _take_lines(f, count=MAX_DEFAULT_LINES)
+                        if total_lines > MAX_DEFAULT_LINES:
+                            all_lines.append(f"\n\n... (File has more than {MAX_DEFAULT_LINES} lines. Use read(path, lines='{MAX_DEFAULT_LINES + 1}:') to read more)")
                         content = ''.join(all_lines)
+                        lines_shown = len(all_lines)
                 except Exception as e:
                     return ToolResult.fail(
                         error=f"Failed to read file: {str(e)}",
@@ -314,21 +558,19 @@ def read(
         else:
             # Read with default line limit to prevent memory issues
             try:
-                with open(full_path, 'r', encoding=encoding, errors='replace') as f:
-                    all_lines = []
-                    for i, line in enumerate(f, 1):
-                        if i > MAX_DEFAULT_LINES:
-                            all_lines.append(f"\n\n... (File has more than {MAX_DEFAULT_LINES} lines. Use read(path, lines='{MAX_DEFAULT_LINES + 1}:') to read more)")
-                            break
-                        all_lines.append(line)
+                with _open_text(raw, encoding) as f:
+                    all_lines = _take_lines(f, count=MAX_DEFAULT_LINES)
+                    if total_lines > MAX_DEFAULT_LINES:
+                        all_lines.append(f"\n\n... (File has more than {MAX_DEFAULT_LINES} lines. Use read(path, lines='{MAX_DEFAULT_LINES + 1}:') to read more)")
                     content = ''.join(all_lines)
+                    lines_shown = len(all_lines)
             except Exception as e:
                 return ToolResult.fail(
                     error=f"Failed to read file: {str(e)}",
                     status=ToolStatus.FAILURE
                 )
 
-        # Truncate if too long (after applying line range to save memory)
+        # Truncate if too long; reading stopped just past the limit
         truncated = False
         if len(content) > MAX_OUTPUT_LENGTH:
             content = content[:MAX_OUTPUT_LENGTH]
@@ -348,14 +590,14 @@ def read(
             "size": file_size,
             "encoding": encoding,
             "total_lines": total_lines,
-            "lines_shown": len(all_lines),
+            "lines_shown": lines_shown,
             "truncated": truncated
         }
         
         if lines:
             metadata["line_range"] = lines
         
-        logger.debug(f"Read file: {path} ({len(all_lines)} lines, {len(content)} chars)")
+        logger.debug(f"Read file: {path} ({lines_shown} lines, {len(content)} chars)")
         
         return ToolResult.ok(
             output=result_text,
@@ -7,14 +7,18 @@ Manages a TODO list file (todo.md) for task tracking.
 from __future__ import annotations
 
 import logging
+import re
 from pathlib import Path
 from typing import Optional
 
-from .base import tool, ToolResult, ToolStatus
+from .base import tool, ToolResult, ToolStatus, _resolved_workspace
 
 # Configure module logger
 logger = logging.getLogger(__name__)
 
+# Checkbox item ("- [ ] task", "[x] task"): captures the state and the task text
+_TODO_ITEM_RE = re.compile(r'(?:-\s*)?\[([ xX])\]\s*(.*)')
+
 
 @tool(
     name="todowrite",
@@ -48,7 +52,7 @@ def todowrite(
         
         # Ensure it's inside workspace
         try:
-            todo_path.relative_to(workspace)
+            todo_path.relative_to(_resolved_workspace(workspace))
         except ValueError:
              return ToolResult.fail(
                 error=f"Access denied: Path {todo_path} is outside workspace",
@@ -71,13 +75,15 @@ def todowrite(
                 continue
             
             # Identify todo items
-            if line.startswith('- [ ]') or line.startswith('[ ]'):
-                total += 1
-                formatted_lines.append(f"  [ ] {line.replace('- [ ]', '').replace('[ ]', '').strip()}")
-            elif line.startswith('- [x]') or line.startswith('[x]'):
+            item = _TODO_ITEM_RE.match(line)
+            if item:
+                state, text = item.groups()
                 total += 1
-                done += 1
-                formatted_lines.append(f"  [x] {line.replace('- [x]', '').replace('[x]', '').strip()}")
+                if state == ' ':
+                    formatted_lines.append(f"  [ ] {text}")
+                else:
+                    done += 1
+                    formatted_lines.append(f"  [x] {text}")
             else:
                 # Just a header or note
                 formatted_lines.append(f"  {line}")
@@ -0,0 +1,73 @@
+"""Tests for the Python search fallback"""
+
+import re
+
+import pytest
+
+from rxdsec.tools.grep import _is_line_local, search_python
+
+
+SAMPLE = "foo\nbar\n  foo\nfoo bar\nbarfoo\nfoo \nx foo\n\nbar foo\nbar"
+
+# Patterns that see past their line's end in a whole-file pass: each one
+# misses lines of SAMPLE that a line-by-line search matches
+CROSS_LINE_PATTERNS = [
+    r"foo\s$",
+    r"foo\s\B",
+    r"foo[^x](?!b)",
+    r"(?s)foo.$",
+    r"foo\n\Z",
+    r"\Afoo",
+    r"(?<!\n)foo",
+]
+
+# Patterns that may match across lines but only ever nominate the right line
+LINE_LOCAL_PATTERNS = [
+    r"foo",
+    r"fo+$",
+    r"^\s*foo",
+    r"\bbar\b",
+    r"o\s",
+    r"[^ ]foo",
+    r"foo\s+\w",
+    r"foo(?!\S)",
+    r"foo\n",
+]
+
+
+def _reference(pattern, text):
+    """Matches of a plain line-by-line search with universal newlines"""
+    compiled = re.compile(pattern)
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").splitlines(keepends=True)
+    found = []
+    for number, line in enumerate(lines, start=1):
+        match = compiled.search(line)
+        if match:
+            found.append((number, line, match.start(), match.end()))
+    return found
+
+
+def _search(pattern, text, tmp_path):
+    (tmp_path / "sample.txt").write_bytes(text.encode())
+    return [
+        (m.line_number, m.line_content, m.match_start, m.match_end)
+        for m in search_python(pattern, tmp_path)
+    ]
+
+
+@pytest.mark.parametrize("pattern", CROSS_LINE_PATTERNS)
+def test_cross_line_patterns_are_not_line_local(pattern):
+    assert not _is_line_local(pattern)
+
+
+@pytest.mark.parametrize("pattern", LINE_LOCAL_PATTERNS)
+def test_simple_patterns_are_line_local(pattern):
+    assert _is_line_local(pattern)
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n", "\r"])
+@pytest.mark.parametrize("trailing", ["", "\n"])
+@pytest.mark.parametrize("pattern", CROSS_LINE_PATTERNS + LINE_LOCAL_PATTERNS)
+def test_search_matches_line_by_line_search(pattern, newline, trailing, tmp_path):
+    text = (SAMPLE + trailing).replace("\n", newline)
+    assert _search(pattern, text, tmp_path) == _reference(pattern, text)
@@ -0,0 +1,74 @@
+"""Tests for command execution"""
+
+import asyncio
+import gc
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from rxdsec.tools import localexec
+from rxdsec.tools.localexec import MAX_OUTPUT_SIZE, _communicate, run_command_async
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="uses POSIX shell commands")
+
+
+def _popen(cmd, capture_output=True):
+    pipe = subprocess.PIPE if capture_output else None
+    return subprocess.Popen(cmd, stdout=pipe, stderr=pipe, bufsize=0)
+
+
+def test_communicate_caps_output_one_byte_past_limit():
+    process = _popen(["head", "-c", str(MAX_OUTPUT_SIZE * 2), "/dev/zero"])
+    stdout, stderr, timed_out = _communicate(process, 10)
+    assert len(stdout) == MAX_OUTPUT_SIZE + 1
+    assert stderr == b""
+    assert not timed_out
+    assert process.returncode == 0
+
+
+def test_communicate_kills_on_timeout_and_keeps_output(monkeypatch):
+    monkeypatch.setattr(localexec, "KILL_GRACE_SECONDS", 1)
+    process = _popen(["sh", "-c", "echo hi; exec sleep 10"])
+    start = time.monotonic()
+    stdout, _, timed_out = _communicate(process, 0.5)
+    assert timed_out
+    assert stdout == b"hi\n"
+    assert time.monotonic() - start < 5
+    assert process.returncode is not None
+
+
+def test_communicate_without_capture():
+    process = _popen(["sh", "-c", "exit 3"], capture_output=False)
+    assert _communicate(process, 10) == (b"", b"", False)
+    assert process.returncode == 3
+
+
+def test_communicate_waits_when_pipes_close_first():
+    process = _popen(["sh", "-c", "echo out; exec >&- 2>&-; sleep 0.3; exit 4"])
+    stdout, _, timed_out = _communicate(process, 10)
+    assert stdout == b"out\n"
+    assert not timed_out
+    assert process.returncode == 4
+
+
+def test_run_command_async_collects_output():
+    result = asyncio.run(run_command_async("sh -c 'echo out; echo err >&2; exit 2'", timeout=10))
+    assert (result.returncode, result.stdout, result.stderr) == (2, "out\n", "err\n")
+    assert not result.timed_out
+
+
+def test_run_command_async_timeout_with_background_child(monkeypatch):
+    monkeypatch.setattr(localexec, "KILL_GRACE_SECONDS", 0.5)
+    unraisable = []
+    monkeypatch.setattr(sys, "unraisablehook", unraisable.append)
+    
+    # The background sleep keeps the pipes open after the shell exits
+    result = asyncio.run(run_command_async("sh -c 'echo hi; sleep 3 &'", timeout=0.5))
+    gc.collect()
+    
+    assert result.timed_out
+    assert result.stdout == "hi\n"
+    assert unraisable == []
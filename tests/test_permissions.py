@@ -0,0 +1,50 @@
+"""Tests for permission rule matching"""
+
+import ntpath
+import os
+
+from rxdsec.permissions import PermissionAction, PermissionRule, PermissionsEngine, ToolCategory
+
+
+def test_deny_rules_match_windows_paths(tmp_path, monkeypatch):
+    # Simulate Windows path semantics: fnmatch lowercases and uses backslashes
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.setattr(os.path, "normcase", ntpath.normcase)
+    # Presets are compiled once per class; don't leak Windows-style regexes
+    monkeypatch.setattr(PermissionsEngine, "_PRESET_RULES_CACHE", None)
+    
+    rule = PermissionRule(PermissionAction.DENY, ToolCategory.READ, "**/secrets/**")
+    assert rule.matches("read", r"C:\proj\secrets\key.txt")
+    
+    engine = PermissionsEngine(tmp_path)
+    try:
+        assert not engine.check("read", r"C:\proj\secrets\key.txt")
+        assert not engine.check("read", "C:/proj/.ENV")
+        assert engine.check_many("read", ["C:/proj/.ENV", r"C:\proj\main.py"]) == [False, True]
+    finally:
+        engine.stop_watching()
+
+
+def test_empty_pattern_half_matches_only_empty_resource():
+    for pattern in ("", "read:"):
+        rule = PermissionRule(PermissionAction.DENY, ToolCategory.ALL, pattern)
+        assert not rule._universal
+        assert rule.matches("read", "")
+        assert not rule.matches("read", "main.py")
+    
+    assert PermissionRule(PermissionAction.DENY, ToolCategory.ALL, "**")._universal
+
+
+def test_security_preset_confirms_posix_writes(tmp_path, monkeypatch):
+    # Uses whatever preset cache earlier tests left behind
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    
+    engine = PermissionsEngine(tmp_path)
+    try:
+        config = engine._load_config()
+        config.active_preset = "security"
+        runs = config.get_resource_runs("write")
+        assert runs[0][0] == PermissionAction.CONFIRM
+        assert runs[0][1] is None or runs[0][1]("/proj/a.py") is not None
+    finally:
+        engine.stop_watching()